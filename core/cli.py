@@ -13,8 +13,6 @@ import argparse
 import os
 import logging
 from datetime import datetime
-import daemon
-import lockfile
 import signal
 import time
 
@@ -22,9 +20,8 @@ from typing import Dict, Any, List, Optional
 
 from wcwidth import wcswidth
 
-# 导入项目其他模块
-from .scanner import DomainScanner
-from .config_parser import ConfigParser
+# 注意: daemon、lockfile、扫描器和配置解析器在实际需要时才导入，
+# 使 --help / --version 等路径无需加载整个依赖链
 
 # 程序版本和描述
 PROGRAM_NAME = "Domain Seeker"
@@ -58,8 +55,15 @@ def parse_arguments() -> argparse.Namespace:
 
     return parser.parse_args()
 
-def print_banner() -> None:
-    """打印程序横幅 (已修正中文字符对齐)"""
+def _build_banner() -> str:
+    """
+    构建程序横幅字符串 (已修正中文字符对齐)
+
+    横幅内容只依赖模块常量，因此在导入时计算一次即可
+
+    返回:
+        横幅字符串
+    """
 
     # 1. 准备文本
     program_text = f"{PROGRAM_NAME}  v{VERSION}"
@@ -114,15 +118,24 @@ def print_banner() -> None:
     │                                         │
     └─────────────────────────────────────────┘
     """
-    # 7. 打印 Banner
-    print(banner)
+    return banner
+
+# 预先计算的程序横幅
+_BANNER = _build_banner()
 
-def setup_logging(verbose: bool = False) -> None:
+def print_banner() -> None:
+    """打印程序横幅"""
+    print(_BANNER)
+
+def setup_logging(verbose: bool = False) -> logging.FileHandler:
     """
     设置日志记录
 
     参数:
         verbose: 是否启用详细日志
+
+    返回:
+        log.txt的文件处理器 (守护进程需要保留其文件描述符)
     """
     # 清除现有的日志处理器
     for handler in logging.root.handlers[:]:
@@ -150,6 +163,8 @@ def setup_logging(verbose: bool = False) -> None:
     logging.info(f"{PROGRAM_NAME} v{VERSION} 启动")
     logging.info(f"日志级别: {'DEBUG' if verbose else 'INFO'}")
 
+    return file_handler
+
 def run_scanner(config: Dict[str, Any], verbose: bool) -> int:
     """
     运行域名扫描器
@@ -161,6 +176,8 @@ def run_scanner(config: Dict[str, Any], verbose: bool) -> int:
     返回:
         退出代码 (0表示成功，非0表示错误)
     """
+    from .scanner import DomainScanner
+
     try:
         # 初始化扫描器
         scanner = DomainScanner(config=config)
@@ -177,72 +194,117 @@ def run_scanner(config: Dict[str, Any], verbose: bool) -> int:
         logging.error(f"扫描过程中出现错误: {e}", exc_info=True)
         return 1
 
-def daemon_run(config: Dict[str, Any], verbose: bool) -> int:
+def daemon_run(config: Dict[str, Any], verbose: bool,
+               log_handler: Optional[logging.FileHandler] = None) -> int:
     """
     以守护进程模式运行扫描器
 
     参数:
         config: 配置字典
         verbose: 是否详细输出模式
+        log_handler: fork前已打开的日志文件处理器，守护进程中继续沿用
 
     返回:
         退出代码
     """
-    # 创建PID文件目录
-    if not os.path.exists("pid"):
-        os.makedirs("pid")
+    import daemon
+    import lockfile
+
+    # 创建PID文件目录 (已存在时不报错)
+    try:
+        os.makedirs("pid", exist_ok=True)
+    except OSError as e:
+        print(f"错误: 无法创建PID文件目录 pid: {e}")
+        return 1
 
     # 生成PID文件路径
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     pid_file = f"pid/scanner_{timestamp}.pid"
 
-    # 记录守护进程信息
-    print(f"将在后台运行扫描任务...")
-    print(f"PID文件: {pid_file}")
-    print(f"日志文件: log.txt")
-    print(f"结果文件: results.txt")
-    print("您可以关闭此终端，扫描将继续在后台执行")
+    # 记录守护进程信息 (一次写出，并在fork前刷新缓冲区)
+    sys.stdout.write(
+        "将在后台运行扫描任务...\n"
+        f"PID文件: {pid_file}\n"
+        "日志文件: log.txt\n"
+        "结果文件: results.txt\n"
+        "您可以关闭此终端，扫描将继续在后台执行\n"
+    )
+    sys.stdout.flush()
 
     # 设置守护进程上下文
     context = daemon.DaemonContext(
         working_directory=os.getcwd(),
         umask=0o002,
         pidfile=lockfile.FileLock(pid_file),
-        detach_process=True
+        detach_process=True,
+        files_preserve=[log_handler.stream] if log_handler else None
     )
 
     # 启动守护进程
     with context:
-        # 重新配置日志
-        setup_logging(verbose=True)  # 守护进程模式总是使用详细日志
+        # 守护进程模式总是使用详细日志
+        if log_handler is None:
+            setup_logging(verbose=True)
+        else:
+            # 复用fork前打开的log.txt，避免再次截断丢失已写入的日志
+            logging.root.setLevel(logging.DEBUG)
+            for handler in logging.root.handlers:
+                handler.setLevel(logging.DEBUG)
         logging.info(f"守护进程已启动，PID文件: {pid_file}")
 
         # 运行扫描器
         return run_scanner(config, verbose=True)
 
+def _dir_entries(path: str = ".") -> Dict[str, os.DirEntry]:
+    """
+    一次性扫描目录，返回目录项字典
+
+    使用单次os.scandir代替多次os.path.exists，减少stat系统调用
+
+    参数:
+        path: 要扫描的目录
+
+    返回:
+        {文件名: DirEntry} 字典，目录不可读时返回空字典
+    """
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
 def check_files() -> None:
     """检查必要的文件是否存在"""
-    files_ok = True
+    errors: List[str] = []
+    entries = _dir_entries(".")
 
     # 检查配置文件
-    if not os.path.exists("config.txt"):
-        print("错误: 未找到配置文件 config.txt")
-        print("请确保config.txt文件存在并正确配置")
-        print("您可以从example目录复制一个配置文件示例")
-        files_ok = False
+    if "config.txt" not in entries:
+        errors.append(
+            "错误: 未找到配置文件 config.txt\n"
+            "请确保config.txt文件存在并正确配置\n"
+            "您可以从example目录复制一个配置文件示例\n"
+        )
 
     # 检查域名源文件
-    if not os.path.exists("domains.txt") and not os.path.exists("generator_func.py"):
-        print("错误: 未找到域名源文件 (domains.txt 或 generator_func.py)")
-        print("您需要提供以下文件之一:")
-        print("  - domains.txt: 每行一个域名基础部分")
-        print("  - generator_func.py: 包含generate_domains()函数的Python脚本")
-        print("示例文件可以在example目录中找到")
-        files_ok = False
-
-    # 如果文件检查失败，退出程序
-    if not files_ok:
-        print("\n您可以查看example目录中的示例文件作为参考")
+    if "domains.txt" not in entries and "generator_func.py" not in entries:
+        errors.append(
+            "错误: 未找到域名源文件 (domains.txt 或 generator_func.py)\n"
+            "您需要提供以下文件之一:\n"
+            "  - domains.txt: 每行一个域名基础部分\n"
+            "  - generator_func.py: 包含generate_domains()函数的Python脚本\n"
+            "示例文件可以在example目录中找到\n"
+        )
+
+    # 检查工作目录是否可写 (log.txt、results.txt 和 pid 目录都写在这里)
+    # 使用os.access代替试探性地打开文件，不会产生空文件
+    if not os.access(".", os.W_OK):
+        errors.append("错误: 当前目录不可写，无法创建日志、结果和PID文件\n")
+
+    # 如果文件检查失败，一次性输出所有错误后退出程序
+    if errors:
+        errors.append("\n您可以查看example目录中的示例文件作为参考\n")
+        sys.stdout.write("".join(errors))
         sys.exit(1)
 
 def main() -> int:
@@ -252,20 +314,23 @@ def main() -> int:
     返回:
         退出代码 (0表示成功，非0表示错误)
     """
+    # 先解析命令行参数: --help / --version (包括argparse接受的缩写如--he、--vers)
+    # 由argparse输出后直接退出，跳过横幅、日志文件和配置读取
+    args = parse_arguments()
+    verbose = args.verbose
+
     # 打印程序横幅
     print_banner()
 
     try:
-        # 解析命令行参数
-        args = parse_arguments()
-
         # 设置日志
-        setup_logging(verbose=args.verbose)
+        log_handler = setup_logging(verbose=verbose)
 
         # 检查和创建必要的文件
         check_files()
 
         # 解析配置文件
+        from .config_parser import ConfigParser
         config_parser = ConfigParser()
         config = config_parser.parse_config()
 
@@ -277,11 +342,11 @@ def main() -> int:
         logging.info(f"通知方法: {config['notification_method']}")
 
         # 以守护进程模式运行扫描器
-        return daemon_run(config, args.verbose)
+        return daemon_run(config, verbose, log_handler)
 
     except Exception as e:
         print(f"发生未预期的错误: {e}")
-        if args.verbose:
+        if verbose:
             import traceback
             traceback.print_exc()
         return 1
@@ -9,19 +9,62 @@ config_parser.py
 """
 
 import os
+import re
 import logging
-from typing import Dict, Any, List, Optional
+import pathlib
+import types
+from typing import Dict, Any, List, Optional, Tuple
 
-# 默认配置
-DEFAULT_CONFIG = {
-    "tlds": [".com", ".org", ".net"],
+# 配置日志
+logger = logging.getLogger("config")
+
+# 默认配置 (只读模板，使用时通过_copy_config获取可修改的副本)
+DEFAULT_CONFIG = types.MappingProxyType({
+    "tlds": (".com", ".org", ".net"),
     "delay": 1.0,
     "max_retries": 2,
     "hedgedoc_url": "https://domain.gfw.li",
+    "rdap_cache": "",  # RDAP结果缓存文件路径，为空时只在内存中缓存
     "domain_source": "auto",  # auto, file, generator
     "notification_method": "none",  # none, email, telegram等
-    "notification_config": {},      # 通知配置,如email地址等
-}
+    "notification_config": types.MappingProxyType({}),  # 通知配置,如email地址等
+})
+
+# 预编译的TLD格式校验正则
+_TLD_RE = re.compile(r'^\.[A-Za-z0-9.]+$')
+
+# 配置行正则: 注释行 | 键 = 值 | 其他无法解析的非空行
+_CFG_RE = re.compile(
+    r'^[ \t]*(?:#.*|([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)|(\S.*?))[ \t\r]*$',
+    re.M
+)
+
+# 支持的通知方法
+_VALID_METHODS = frozenset({"none", "email", "telegram"})
+
+# 支持的域名源
+_VALID_SOURCES = frozenset({"auto", "file", "generator"})
+
+# 已解析配置的缓存，键为 (绝对路径, 修改时间ns, 文件大小)
+_CONFIG_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+
+def _copy_config(config) -> Dict[str, Any]:
+    """
+    复制配置字典
+
+    配置中只有tlds列表和notification_config字典是可变容器，
+    单独复制这两项即可，无需deepcopy递归遍历
+
+    参数:
+        config: 源配置 (字典或DEFAULT_CONFIG模板)
+
+    返回:
+        可独立修改的配置字典
+    """
+    result = dict(config)
+    result["tlds"] = list(config["tlds"])
+    result["notification_config"] = dict(config["notification_config"])
+    return result
 
 class ConfigParser:
     """配置解析器类，处理配置文件的读取和验证"""
@@ -34,8 +77,7 @@ class ConfigParser:
             config_path: 配置文件路径
         """
         self.config_path = config_path
-        self.logger = logging.getLogger("config")
-        self.config = DEFAULT_CONFIG.copy()
+        self.config = _copy_config(DEFAULT_CONFIG)
 
     def parse_config(self) -> Dict[str, Any]:
         """
@@ -44,35 +86,48 @@ class ConfigParser:
         返回:
             配置字典
         """
-        if not os.path.exists(self.config_path):
-            self.logger.warning(f"配置文件 {self.config_path} 不存在，将创建默认配置")
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
+            logger.warning(f"配置文件 {self.config_path} 不存在，将创建默认配置")
             self._create_default_config()
             return self.config
 
+        # 文件未变化时直接返回缓存的解析结果
+        cache_key = (os.path.abspath(self.config_path), st.st_mtime_ns, st.st_size)
+        if cache_key in _CONFIG_CACHE:
+            logger.debug(f"配置文件未变化，使用缓存: {self.config_path}")
+            self.config = _copy_config(_CONFIG_CACHE[cache_key])
+            return self.config
+
         try:
-            self.logger.info(f"正在读取配置文件: {self.config_path}")
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    # 跳过空行和注释
-                    if not line or line.startswith('#'):
-                        continue
-
-                    # 解析键值对
-                    try:
-                        key, value = [part.strip() for part in line.split('=', 1)]
-                        self._process_config_item(key, value)
-                    except ValueError:
-                        self.logger.warning(f"无法解析配置行: {line}")
+            logger.info(f"正在读取配置文件: {self.config_path}")
+            try:
+                # 配置文件很小，一次读入整个内容
+                text = pathlib.Path(self.config_path).read_text(encoding='utf-8')
+            except FileNotFoundError:
+                # stat之后文件被删除，按不存在处理
+                logger.warning(f"配置文件 {self.config_path} 不存在，将创建默认配置")
+                self._create_default_config()
+                return self.config
+
+            # 一次正则扫描整个文件，空行和注释行不产生键值
+            for m in _CFG_RE.finditer(text):
+                key, value, bad_line = m.groups()
+                if key is not None:
+                    self._process_config_item(key, value)
+                elif bad_line is not None:
+                    logger.warning(f"无法解析配置行: {bad_line}")
 
             # 验证配置
             self._validate_config()
+            _CONFIG_CACHE[cache_key] = _copy_config(self.config)
             return self.config
 
         except Exception as e:
-            self.logger.error(f"读取配置文件时出错: {e}", exc_info=True)
-            self.logger.warning("使用默认配置继续")
-            return DEFAULT_CONFIG.copy()
+            logger.error(f"读取配置文件时出错: {e}", exc_info=True)
+            logger.warning("使用默认配置继续")
+            return _copy_config(DEFAULT_CONFIG)
 
     def _process_config_item(self, key: str, value: str) -> None:
         """
@@ -82,65 +137,97 @@ class ConfigParser:
             key: 配置键
             value: 配置值字符串
         """
-        if key == "tlds":
-            # 处理TLD列表
-            tlds = [tld.strip() for tld in value.split(',')]
-            # 确保所有TLD都以.开头
-            tlds = [tld if tld.startswith('.') else f'.{tld}' for tld in tlds]
-            self.config["tlds"] = tlds
-
-        elif key == "domain_source":
-            if value in ["auto", "file", "generator"]:
-                self.config["domain_source"] = value
+        handler = self._HANDLERS.get(key)
+        if handler is not None:
+            handler(self, value)
+        elif key.startswith("notification_"):
+            self._handle_notification(key, value)
+        else:
+            logger.warning(f"未知配置项: {key}")
+
+    def _handle_tlds(self, value: str) -> None:
+        """处理TLD列表"""
+        tlds = [tld.strip() for tld in value.split(',')]
+        # 确保所有TLD都以.开头
+        tlds = [tld if tld.startswith('.') else f'.{tld}' for tld in tlds]
+        # 过滤格式无效的TLD
+        valid_tlds = []
+        for tld in tlds:
+            if _TLD_RE.match(tld):
+                valid_tlds.append(tld)
             else:
-                self.logger.warning(f"无效的domain_source值: {value}，使用默认值: {DEFAULT_CONFIG['domain_source']}")
-
-        elif key == "delay":
-            try:
-                delay = float(value)
-                self.config["delay"] = max(0.1, delay)  # 至少0.1秒
-            except ValueError:
-                self.logger.warning(f"无效的delay值: {value}，使用默认值: {DEFAULT_CONFIG['delay']}")
-
-        elif key == "max_retries":
-            try:
-                retries = int(value)
-                self.config["max_retries"] = max(0, retries)
-            except ValueError:
-                self.logger.warning(f"无效的max_retries值: {value}，使用默认值: {DEFAULT_CONFIG['max_retries']}")
-
-        elif key == "hedgedoc_url":
-            self.config["hedgedoc_url"] = value.rstrip('/')
+                logger.warning(f"无效的TLD格式: {tld}，已忽略")
+        self.config["tlds"] = valid_tlds
 
-        elif key == "notification_method":
-            self.config["notification_method"] = value
+    def _handle_domain_source(self, value: str) -> None:
+        """处理域名源设置"""
+        if value in _VALID_SOURCES:
+            self.config["domain_source"] = value
+        else:
+            logger.warning(f"无效的domain_source值: {value}，使用默认值: {DEFAULT_CONFIG['domain_source']}")
 
-        elif key.startswith("notification_"):
-            # 存储通知相关的其他配置
-            subkey = key[13:]  # 去掉"notification_"前缀
-            if "notification_config" not in self.config:
-                self.config["notification_config"] = {}
-            self.config["notification_config"][subkey] = value
+    def _handle_delay(self, value: str) -> None:
+        """处理查询间隔"""
+        try:
+            delay = float(value)
+            self.config["delay"] = max(0.1, delay)  # 至少0.1秒
+        except ValueError:
+            logger.warning(f"无效的delay值: {value}，使用默认值: {DEFAULT_CONFIG['delay']}")
 
-        else:
-            self.logger.warning(f"未知配置项: {key}")
+    def _handle_max_retries(self, value: str) -> None:
+        """处理最大重试次数"""
+        try:
+            retries = int(value)
+            self.config["max_retries"] = max(0, retries)
+        except ValueError:
+            logger.warning(f"无效的max_retries值: {value}，使用默认值: {DEFAULT_CONFIG['max_retries']}")
+
+    def _handle_hedgedoc_url(self, value: str) -> None:
+        """处理HedgeDoc服务URL"""
+        self.config["hedgedoc_url"] = value.rstrip('/')
+
+    def _handle_rdap_cache(self, value: str) -> None:
+        """处理RDAP结果缓存文件路径"""
+        self.config["rdap_cache"] = value
+
+    def _handle_notification_method(self, value: str) -> None:
+        """处理通知方法"""
+        self.config["notification_method"] = value
+
+    def _handle_notification(self, key: str, value: str) -> None:
+        """存储通知相关的其他配置"""
+        subkey = key[13:]  # 去掉"notification_"前缀
+        if "notification_config" not in self.config:
+            self.config["notification_config"] = {}
+        self.config["notification_config"][subkey] = value
+
+    # 配置键到处理方法的分派表
+    _HANDLERS = {
+        "tlds": _handle_tlds,
+        "domain_source": _handle_domain_source,
+        "delay": _handle_delay,
+        "max_retries": _handle_max_retries,
+        "hedgedoc_url": _handle_hedgedoc_url,
+        "rdap_cache": _handle_rdap_cache,
+        "notification_method": _handle_notification_method,
+    }
 
     def _validate_config(self) -> None:
         """验证配置是否有效"""
         # 确保必要的配置项存在
         if not self.config.get("tlds"):
-            self.logger.warning("配置中未设置TLD，使用默认TLD")
-            self.config["tlds"] = DEFAULT_CONFIG["tlds"]
+            logger.warning("配置中未设置TLD，使用默认TLD")
+            self.config["tlds"] = list(DEFAULT_CONFIG["tlds"])
 
         # 验证通知设置
         method = self.config.get("notification_method", "none")
-        if method not in ["none", "email", "telegram"]:
-            self.logger.warning(f"不支持的通知方法: {method}，使用'none'")
+        if method not in _VALID_METHODS:
+            logger.warning(f"不支持的通知方法: {method}，使用'none'")
             self.config["notification_method"] = "none"
 
         # 如果使用email通知，确保有邮箱地址
         if method == "email" and not self.config.get("notification_config", {}).get("email"):
-            self.logger.warning("选择了Email通知但未提供邮箱地址，通知功能将被禁用")
+            logger.warning("选择了Email通知但未提供邮箱地址，通知功能将被禁用")
             self.config["notification_method"] = "none"
 
     def _create_default_config(self) -> None:
@@ -153,7 +240,7 @@ class ConfigParser:
 # 要扫描的顶级域名列表，多个TLD用逗号分隔
 tlds = .com, .org, .net
 
-# 查询间隔(秒)，建议不小于0.5秒，避免触发速率限制
+# 对同一RDAP服务器的查询间隔(秒)，共用同一服务器的TLD (如.com和.net) 共享该间隔，建议不小于0.5秒，避免触发速率限制
 delay = 1.0
 
 # 查询失败时的最大重试次数
@@ -162,6 +249,9 @@ max_retries = 2
 # HedgeDoc服务URL，用于上传结果
 hedgedoc_url = https://domain.gfw.li
 
+# RDAP查询结果缓存文件，重复扫描时跳过短期内已确认的域名 (留空则不写入文件)
+# rdap_cache = rdap_cache.db
+
 # 通知方法: none, email, telegram
 notification_method = none
 
@@ -171,7 +261,9 @@ notification_email = your-email@example.com
 # Telegram通知配置 (当notification_method = telegram时生效)
 notification_telegram_token = your-bot-token
 notification_telegram_chat_id = your-chat-id
+# 是否以Markdown格式发送Telegram消息 (默认纯文本)
+# notification_telegram_markdown = false
 """)
-                self.logger.info(f"已创建默认配置文件: {self.config_path}")
+                logger.info(f"已创建默认配置文件: {self.config_path}")
         except Exception as e:
-            self.logger.error(f"创建默认配置文件失败: {e}")
+            logger.error(f"创建默认配置文件失败: {e}")
@@ -11,8 +11,9 @@ generators.py
 import re
 import sys
 import os
+import mmap
 import importlib.util
-from typing import Generator, Set, Optional, Callable, List, Iterator, Dict, Any, cast
+from typing import Generator, Set, Optional, Callable, List, Iterator, Dict, Any, BinaryIO, Tuple, cast
 import logging
 
 # 配置日志
@@ -22,6 +23,15 @@ logger = logging.getLogger("generators")
 MAX_DOMAIN_LENGTH = 63  # 域名最大长度(不含TLD)
 DOMAIN_REGEX = re.compile(r'^[a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?$')
 
+# 文件批量解析相关常量 (作用于已转小写的字节块，逐行多行匹配)
+FILE_CHUNK_SIZE = 8 << 20  # 每次读取8MB
+DOMAIN_LINE_REGEX = re.compile(rb'^[ \t\r\f\v]*([a-z0-9](?:[a-z0-9\-]{0,61}[a-z0-9])?)[ \t\r\f\v]*$', re.M)
+SKIP_LINE_REGEX = re.compile(rb'^[ \t\r\f\v]*(?:#.*)?$', re.M)  # 空行和注释行
+
+# 已加载的生成器函数缓存，键为 (绝对路径, 修改时间ns, 文件大小)
+# 磁盘上的字节码缓存由importlib的SourceFileLoader写入__pycache__
+_GENERATOR_CACHE: Dict[Tuple[str, int, int], Callable[[], Iterator[str]]] = {}
+
 
 class DomainGenerator:
     """域名生成器类，用于生成或加载待检查的域名"""
@@ -34,56 +44,151 @@ class DomainGenerator:
         """
         从文件加载域名
 
+        按块读取文件，每块整体转小写后用一次正则扫描提取所有有效行，
+        避免对每一行执行strip/lower/match等Python级调用
+
         参数:
             filepath: 域名文件路径，每行一个域名(不含TLD)
 
         生成:
             有效的域名主体部分(不含TLD)
         """
-        if not os.path.exists(filepath):
-            logger.error(f"文件不存在: {filepath}")
-            raise FileNotFoundError(f"找不到域名文件: {filepath}")
-
         logger.info(f"从文件加载域名: {filepath}")
         line_count = 0
         valid_count = 0
         invalid_count = 0
+        seen = self.seen_domains
 
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                for line in f:
-                    line_count += 1
-                    domain_base = line.strip().lower()
-
-                    # 跳过空行和注释行
-                    if not domain_base or domain_base.startswith('#'):
-                        continue
-
-                    # 验证域名并去重
-                    if self._is_valid_domain_base(domain_base):
-                        if domain_base not in self.seen_domains:
-                            self.seen_domains.add(domain_base)
+            with open(filepath, 'rb') as f:
+                for block in self._iter_mmap_blocks(f):
+                    # 与文本模式的通用换行一致: \r\n和单独的\r都视为换行
+                    if b'\r' in block:
+                        block = block.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+                    block = block.lower()
+
+                    # 块内行数 (以换行结尾时多算的一个空行同样会被SKIP_LINE_REGEX计入)
+                    lines = block.count(b'\n') + 1
+                    matches = DOMAIN_LINE_REGEX.findall(block)
+                    skipped = len(SKIP_LINE_REGEX.findall(block))
+                    bad = lines - skipped - len(matches)
+
+                    # 只有还需要记录无效样本时才逐行定位
+                    if bad and invalid_count <= 5:
+                        self._log_invalid_lines(block, line_count, invalid_count)
+                    invalid_count += bad
+
+                    line_count += lines - block.endswith(b'\n')
+
+                    # 去重并产出
+                    for match in matches:
+                        domain_base = match.decode('ascii')
+                        if domain_base not in seen:
+                            seen.add(domain_base)
                             valid_count += 1
                             yield domain_base
-                    else:
-                        invalid_count += 1
-                        if invalid_count <= 5:  # 只记录前几个无效域名，避免日志过大
-                            logger.warning(f"无效的域名格式: '{domain_base}' (行 {line_count})")
-                        elif invalid_count == 6:
-                            logger.warning("更多无效域名省略...")
 
             logger.info(f"文件解析完成。总行数: {line_count}, 有效域名: {valid_count}, 无效域名: {invalid_count}")
 
             if valid_count == 0:
                 logger.warning(f"警告: 未从文件中找到有效域名，请检查文件格式是否正确")
 
-        except UnicodeDecodeError as e:
-            logger.error(f"文件编码错误: {e}")
-            raise ValueError(f"无法解析文件 {filepath}: {e}")
+        except FileNotFoundError:
+            # 直接由open报告文件不存在，无需事先单独stat
+            logger.error(f"文件不存在: {filepath}")
+            raise FileNotFoundError(f"找不到域名文件: {filepath}")
         except Exception as e:
             logger.error(f"读取文件时出错: {e}")
             raise
 
+    def _iter_mmap_blocks(self, f: BinaryIO) -> Iterator[bytes]:
+        """
+        通过只读内存映射按块切分文件，保证每块都在行边界结束
+
+        直接从映射区切片，省去逐块read的复制和拼接不完整末行的开销；
+        无法映射时(空文件、管道等)回退到普通读取
+
+        参数:
+            f: 以二进制模式打开的文件对象
+
+        生成:
+            由完整行组成的字节块 (最后一块可能没有结尾换行)
+        """
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield from self._iter_line_blocks(f)
+            return
+
+        with mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            size = len(mm)
+            start = 0
+            while start < size:
+                end = start + FILE_CHUNK_SIZE
+                if end < size:
+                    # 在块内最后一个换行处切分，超长行则向后找到行尾
+                    nl = mm.rfind(b'\n', start, end)
+                    if nl == -1:
+                        nl = mm.find(b'\n', end)
+                    end = size if nl == -1 else nl + 1
+                else:
+                    end = size
+                yield mm[start:end]
+                start = end
+
+    def _iter_line_blocks(self, f: BinaryIO) -> Iterator[bytes]:
+        """
+        按块读取文件，保证每块都在行边界结束
+
+        参数:
+            f: 以二进制模式打开的文件对象
+
+        生成:
+            由完整行组成的字节块 (最后一块可能没有结尾换行)
+        """
+        pending = b''
+        while True:
+            block = f.read(FILE_CHUNK_SIZE)
+            if not block:
+                break
+
+            # 不完整的末行留到下一块
+            block = pending + block if pending else block
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:
+                pending = block
+                continue
+            pending = block[cut:]
+            yield block[:cut]
+
+        if pending:
+            yield pending
+
+    def _log_invalid_lines(self, block: bytes, first_line: int, invalid_before: int) -> None:
+        """
+        逐行定位块中的无效域名并记录到日志 (只记录前几个)
+
+        参数:
+            block: 已转小写的字节块
+            first_line: 块之前已处理的行数
+            invalid_before: 块之前已发现的无效域名数量
+        """
+        invalid_count = invalid_before
+        for offset, raw in enumerate(block.split(b'\n')):
+            if SKIP_LINE_REGEX.match(raw) or DOMAIN_LINE_REGEX.match(raw):
+                continue
+
+            invalid_count += 1
+            if invalid_count <= 5:  # 只记录前几个无效域名，避免日志过大
+                domain_base = raw.strip().decode('utf-8', errors='replace')
+                logger.warning(f"无效的域名格式: '{domain_base}' (行 {first_line + offset + 1})")
+            else:
+                logger.warning("更多无效域名省略...")
+                return
+
     def from_function(self,
                      generator_func: Optional[Callable[[], Iterator[str]]] = None,
                      generator_file: Optional[str] = None) -> Generator[str, None, None]:
@@ -111,6 +216,7 @@ class DomainGenerator:
             processed_count = 0
             valid_count = 0
             invalid_count = 0
+            seen = self.seen_domains
 
             for domain_base in generator_func():
                 processed_count += 1
@@ -122,8 +228,8 @@ class DomainGenerator:
 
                 # 验证域名并去重
                 if self._is_valid_domain_base(domain_base):
-                    if domain_base not in self.seen_domains:
-                        self.seen_domains.add(domain_base)
+                    if domain_base not in seen:
+                        seen.add(domain_base)
                         valid_count += 1
                         yield domain_base
                 else:
@@ -159,13 +265,17 @@ class DomainGenerator:
         返回:
             生成器函数对象或None(如果加载失败)
         """
-        if not os.path.exists(filepath):
-            logger.error(f"生成器文件不存在: {filepath}")
-            raise FileNotFoundError(f"找不到生成器文件: {filepath}")
-
         try:
             logger.info(f"从文件加载生成器函数: {filepath}")
 
+            # 同一进程内文件未变化时直接复用已加载的函数
+            st = os.stat(filepath)
+            cache_key = (os.path.abspath(filepath), st.st_mtime_ns, st.st_size)
+            cached_func = _GENERATOR_CACHE.get(cache_key)
+            if cached_func is not None:
+                logger.info("生成器文件未变化，复用已加载的generate_domains函数")
+                return cached_func
+
             # 使用importlib动态加载模块
             module_name = os.path.basename(filepath).replace('.py', '')
             spec = importlib.util.spec_from_file_location(module_name, filepath)
@@ -185,7 +295,9 @@ class DomainGenerator:
                 # 检查是否是可调用对象
                 if callable(generator_func):
                     logger.info("成功加载generate_domains函数")
-                    return cast(Callable[[], Iterator[str]], generator_func)
+                    generator_func = cast(Callable[[], Iterator[str]], generator_func)
+                    _GENERATOR_CACHE[cache_key] = generator_func
+                    return generator_func
                 else:
                     logger.error("'generate_domains' 不是一个可调用的函数")
             else:
@@ -194,6 +306,10 @@ class DomainGenerator:
 
             return None
 
+        except FileNotFoundError:
+            # 由os.stat或exec_module报告，无需事先单独检查文件是否存在
+            logger.error(f"生成器文件不存在: {filepath}")
+            raise FileNotFoundError(f"找不到生成器文件: {filepath}")
         except SyntaxError as e:
             logger.error(f"生成器文件语法错误: {e}")
             raise ValueError(f"生成器文件 {filepath} 包含语法错误: {e}")
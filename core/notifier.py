@@ -12,11 +12,16 @@ import logging
 import os
 import smtplib
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from email.message import EmailMessage
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger("notifier")
 
+# Telegram请求超时 (连接, 读取) 秒
+TELEGRAM_TIMEOUT = (3, 10)
+
 class Notifier:
     """通知发送器类，负责处理各种通知方式"""
 
@@ -30,6 +35,20 @@ class Notifier:
         """
         self.method = method
         self.config = config or {}
+
+        # Telegram默认发送纯文本；只有显式开启时才让服务器按Markdown解析
+        # (域名或错误信息中的'_'、'*'等字符会导致Markdown解析失败)
+        self._markdown = str(self.config.get("telegram_markdown", "")).lower() in ("1", "true", "yes", "on")
+
+        # Telegram通知复用同一个会话，避免每次通知都重新进行TLS握手
+        self._session: Optional[requests.Session] = None
+        if method == "telegram":
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(
+                pool_maxsize=8,
+                max_retries=Retry(total=3, backoff_factor=0.2)
+            ))
+
         logger.info(f"初始化通知发送器，方法: {method}")
 
     def send_notification(self, subject: str, message: str, link: Optional[str] = None) -> bool:
@@ -48,8 +67,7 @@ class Notifier:
             logger.info("通知功能未启用")
             return True
 
-        if link:
-            message = f"{message}\n\n结果链接: {link}"
+        message = self._with_link(message, link)
 
         if self.method == "email":
             return self._send_email(subject, message)
@@ -59,6 +77,13 @@ class Notifier:
             logger.warning(f"不支持的通知方法: {self.method}")
             return False
 
+    @staticmethod
+    def _with_link(message: str, link: Optional[str]) -> str:
+        """在通知内容后追加结果链接"""
+        if link:
+            return f"{message}\n\n结果链接: {link}"
+        return message
+
     def _send_email(self, subject: str, message: str) -> bool:
         """发送邮件通知"""
         recipient = self.config.get("email")
@@ -98,24 +123,53 @@ class Notifier:
 
     def _send_telegram(self, subject: str, message: str) -> bool:
         """发送Telegram通知"""
+        token, chat_id = self._telegram_credentials()
+        if not token or not chat_id:
+            return False
+
+        return self._post_telegram(token, chat_id, self._format_telegram(subject, message))
+
+    def _format_telegram(self, subject: str, message: str) -> str:
+        """组合Telegram消息文本，启用Markdown时主题加粗"""
+        if self._markdown:
+            return f"*{subject}*\n\n{message}"
+        return f"{subject}\n\n{message}"
+
+    def _telegram_credentials(self) -> Tuple[Optional[str], Optional[str]]:
+        """读取Telegram的token和chat_id，未配置时记录错误"""
         token = self.config.get("telegram_token")
         chat_id = self.config.get("telegram_chat_id")
 
         if not token or not chat_id:
             logger.error("Telegram通知未配置token或chat_id")
-            return False
 
+        return token, chat_id
+
+    def _post_telegram(self, token: str, chat_id: str, text: str) -> bool:
+        """
+        调用Telegram Bot API发送一条消息
+
+        参数:
+            token: Bot token
+            chat_id: 接收消息的chat_id
+            text: 消息文本
+
+        返回:
+            是否发送成功
+        """
         try:
-            text = f"*{subject}*\n\n{message}"
             url = f"https://api.telegram.org/bot{token}/sendMessage"
-            data = {
+            payload = {
                 "chat_id": chat_id,
-                "text": text,
-                "parse_mode": "Markdown"
+                "text": text
             }
+            if self._markdown:
+                payload["parse_mode"] = "Markdown"
 
             logger.debug(f"发送Telegram请求: {url}")
-            response = requests.post(url, data=data)
+            session = self._session or requests
+            # 以JSON请求体发送，省去表单urlencode
+            response = session.post(url, json=payload, timeout=TELEGRAM_TIMEOUT)
 
             if response.status_code == 200:
                 logger.info("Telegram通知发送成功")
@@ -127,3 +181,9 @@ class Notifier:
         except Exception as e:
             logger.error(f"发送Telegram通知失败: {e}", exc_info=True)
             return False
+
+    def close(self) -> None:
+        """关闭连接会话"""
+        if self._session:
+            self._session.close()
+            self._session = None
@@ -8,11 +8,21 @@ rdap_client.py
 提供高效、可靠的域名可用性检测，支持各种顶级域名(TLD)。
 """
 
+import os
 import time
+import json
+import random
+import sqlite3
+import threading
 import requests
-from typing import Dict, Any, Tuple, Optional, List, Set
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Tuple, Optional, List, Set, FrozenSet, Iterable, Iterator
 import logging
 import re
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
 
 # 配置日志
 logger = logging.getLogger("rdap_client")
@@ -20,26 +30,37 @@ logger = logging.getLogger("rdap_client")
 # RDAP服务配置
 RDAP_ORG_URL = "https://rdap.org/domain/{domain}"  # RDAP.org统一入口
 RDAP_IANA_URL = "https://rdap.iana.org/domain/{domain}"  # IANA RDAP服务
+RDAP_BOOTSTRAP_URL = "https://data.iana.org/rdap/dns.json"  # IANA RDAP引导数据 (TLD -> RDAP服务器)
+
+# RDAP引导数据本地缓存文件及有效期 (秒)
+BOOTSTRAP_CACHE_FILE = os.path.join("~", ".cache", "domainseeker", "rdap_dns.json")
+BOOTSTRAP_CACHE_TTL = 86400
 
 # 特定TLD的直接RDAP服务器 (优先使用这些服务器)
 DIRECT_RDAP_SERVERS = {
     '.ch': 'https://rdap.nic.ch/domain/{domain}',
     '.li': 'https://rdap.nic.ch/domain/{domain}',
     '.de': 'https://rdap.denic.de/domain/{domain}',
+    '.com': 'https://rdap.verisign.com/com/v1/domain/{domain}',
+    '.net': 'https://rdap.verisign.com/net/v1/domain/{domain}',
+    '.org': 'https://rdap.publicinterestregistry.org/rdap/domain/{domain}',
     # 可以根据需要添加更多TLD
 }
 
-# HTTP状态码与域名状态映射
+# HTTP状态码与域名状态映射: 状态码 -> (是否可注册, 英文状态, 中文状态)
 STATUS_CODES = {
-    200: {'available': False, 'status': 'registered', 'status_cn': '已被注册'},
-    401: {'available': False, 'status': 'registered', 'status_cn': '已被注册 (需要授权)'},
-    404: {'available': True, 'status': 'available', 'status_cn': '可以注册'},
-    400: {'available': False, 'status': 'invalid_request', 'status_cn': '无效请求 (域名格式错误)'},
-    429: {'available': False, 'status': 'rate_limited', 'status_cn': '查询频率限制 (请稍后重试)'},
-    403: {'available': False, 'status': 'forbidden', 'status_cn': '服务器拒绝访问'},
-    500: {'available': False, 'status': 'server_error', 'status_cn': '服务器错误 (请稍后重试)'},
-    503: {'available': False, 'status': 'service_unavailable', 'status_cn': '服务不可用 (请稍后重试)'},
-    302: {'available': False, 'status': 'redirect', 'status_cn': '重定向 (跟随Location)'},
+    200: (False, 'registered', '已被注册'),
+    401: (False, 'registered', '已被注册 (需要授权)'),
+    404: (True, 'available', '可以注册'),
+    400: (False, 'invalid_request', '无效请求 (域名格式错误)'),
+    429: (False, 'rate_limited', '查询频率限制 (请稍后重试)'),
+    403: (False, 'forbidden', '服务器拒绝访问'),
+    500: (False, 'server_error', '服务器错误 (请稍后重试)'),
+    503: (False, 'service_unavailable', '服务不可用 (请稍后重试)'),
+    302: (False, 'redirect', '重定向 (跟随Location)'),
+    # 以带Range头的GET代替HEAD时，已注册域名可能返回部分内容或范围无效
+    206: (False, 'registered', '已被注册'),
+    416: (False, 'registered', '已被注册'),
 }
 
 # 预编译域名验证正则表达式
@@ -55,12 +76,321 @@ SERVER_DELAY = {
     'default': 1.0  # 默认延迟
 }
 
+# 查询结果缓存有效期 (秒)，只缓存确定性的结果
+# 可注册的域名随时可能被抢注，因此有效期较短
+CACHE_TTL = {
+    'available': 300,
+    'registered': 86400,
+    'no_rdap_service': 86400,
+}
+
+# 内存缓存最大条目数
+CACHE_MAX_SIZE = 100_000
+
+# SQLite缓存每累计多少次写入提交一次
+CACHE_COMMIT_INTERVAL = 100
+
+# 令牌桶容量: 服务器空闲时最多可连续发出的查询数
+BUCKET_CAPACITY = 5
+
+# 直接服务器返回这些状态时改用RDAP.org查询 (网络错误重试均失败)
+FALLBACK_STATUSES = frozenset({'timeout', 'connection_error', 'error'})
+
+# 连接预热请求的超时时间 (秒)
+WARMUP_TIMEOUT = 5
+
+# 批量查询时每个RDAP服务器的工作线程数，以及同时在途和排队的最大查询数
+HOST_WORKERS = 4
+MAX_PENDING = 64
+
+# 需要等待后重试的HTTP状态码 (限流和服务暂不可用)
+RETRY_STATUS_CODES = frozenset({429, 503})
+
+# 重试退避配置 (秒): 基础延迟、退避上限、Retry-After最长等待
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRY_AFTER_MAX = 60.0
+
+
+def _build_session() -> requests.Session:
+    """
+    创建RDAP查询使用的会话
+
+    连接池按主机保留长连接，重复查询同一RDAP服务器时复用已建立的TLS连接；
+    重试由check_domain自行处理，适配器层不再重试
+
+    返回:
+        配置好连接池的会话对象
+    """
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+    return session
+
+
+# 模块级共享会话，所有RdapClient实例共用同一个连接池
+_SESSION = _build_session()
+
+
+class QueryCancelled(Exception):
+    """客户端已关闭或扫描被中断，取消正在等待令牌或重试的查询"""
+
+
+class TokenBucket:
+    """
+    令牌桶限速器，空闲时积累令牌以允许短时突发查询
+
+    服务器返回限流响应或限流响应头时，暂停整个桶，
+    使发往该服务器的所有查询一起退避
+    """
+
+    def __init__(self, rate: float, capacity: int = BUCKET_CAPACITY,
+                 stop: Optional[threading.Event] = None):
+        """
+        初始化令牌桶
+
+        参数:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量
+            stop: 停止事件，被设置时等待中的acquire立即返回并抛出QueryCancelled
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        # 暂停到该时间点 (monotonic) 之前不发放令牌
+        self.blocked_until = 0.0
+        # 连续收到限流响应的次数，用于指数退避
+        self.consecutive_limited = 0
+        # 多个线程共用同一个令牌桶，锁只保护令牌状态，不在锁内休眠
+        self._lock = threading.Lock()
+        self._stop = stop if stop is not None else threading.Event()
+
+    def acquire(self) -> None:
+        """
+        取得一个令牌，令牌不足时等待补充
+
+        只在锁内计算需要等待的时间，释放锁后再休眠，醒来后重新检查；
+        休眠期间其他线程仍可以记录限流退避
+
+        异常:
+            QueryCancelled: 等待期间停止事件被设置
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait_time = self.blocked_until - now
+                else:
+                    if self.last < self.blocked_until:
+                        # 退避结束后允许立即发出一次查询，之后从退避结束时刻开始补充令牌
+                        self.tokens = max(self.tokens, 1.0)
+                        self.last = self.blocked_until
+
+                    self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                    self.last = now
+
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait_time = (1 - self.tokens) / self.rate
+
+            # 在停止事件上等待，客户端关闭时不必等到退避结束
+            if self._stop.wait(wait_time):
+                raise QueryCancelled("RDAP客户端已关闭，取消等待中的查询")
+
+    def drain(self) -> None:
+        """清空令牌，服务器限流时让后续查询重新按速率等待"""
+        with self._lock:
+            self.tokens = 0.0
+            self.last = time.monotonic()
+
+    def penalize(self, delay: Optional[float] = None) -> float:
+        """
+        服务器返回限流响应时暂停令牌桶
+
+        参数:
+            delay: 服务器要求的等待时间(秒)，为None时按连续限流次数指数退避
+
+        返回:
+            实际暂停的时间(秒)
+        """
+        with self._lock:
+            self.consecutive_limited += 1
+            if delay is None:
+                backoff = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (self.consecutive_limited - 1))
+                delay = backoff * (0.5 + random.random() / 2)
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            return delay
+
+    def observe(self, headers: Any) -> None:
+        """
+        根据正常响应的限流响应头调整令牌桶
+
+        X-RateLimit-Remaining为0时清空令牌，并按X-RateLimit-Reset暂停到配额恢复
+
+        参数:
+            headers: 响应头
+        """
+        remaining = headers.get('X-RateLimit-Remaining') or headers.get('RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset') or headers.get('RateLimit-Reset')
+
+        with self._lock:
+            self.consecutive_limited = 0
+            if remaining is None:
+                return
+            try:
+                if int(float(remaining)) > 0:
+                    return
+            except ValueError:
+                return
+
+            self.tokens = 0.0
+            self.last = time.monotonic()
+            try:
+                wait_seconds = float(reset) if reset is not None else 0.0
+            except ValueError:
+                wait_seconds = 0.0
+            # 部分服务器返回的是配额恢复时刻的Unix时间戳
+            if wait_seconds > 1e9:
+                wait_seconds -= time.time()
+            if wait_seconds > 0:
+                self.blocked_until = max(self.blocked_until,
+                                         time.monotonic() + min(wait_seconds, RETRY_AFTER_MAX))
+
+
+class ResultCache:
+    """RDAP查询结果缓存，内存LRU加可选的SQLite持久化"""
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = CACHE_MAX_SIZE):
+        """
+        初始化结果缓存
+
+        参数:
+            path: SQLite缓存文件路径，为空时只使用内存缓存
+            maxsize: 内存缓存最大条目数
+        """
+        self.maxsize = maxsize
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._pending_writes = 0
+        # 批量查询时多个线程共用缓存
+        self._lock = threading.Lock()
+
+        if path:
+            path = os.path.expanduser(path)
+            try:
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                # WAL模式下提交只追加日志，缓存丢失最后几条结果也无妨，不必每次提交都同步到磁盘
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS rdap_cache "
+                    "(key TEXT PRIMARY KEY, expires REAL NOT NULL, result TEXT NOT NULL)"
+                )
+                # 清理过期条目
+                self._db.execute("DELETE FROM rdap_cache WHERE expires <= ?", (time.time(),))
+                self._db.commit()
+                logger.info(f"已启用RDAP结果缓存文件: {path}")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"无法打开RDAP缓存文件 {path}: {e}，仅使用内存缓存")
+                self._db = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取未过期的缓存结果
+
+        参数:
+            key: 缓存键
+
+        返回:
+            结果字典的副本，未命中时返回None
+        """
+        with self._lock:
+            now = time.time()
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires, result = entry
+                if expires > now:
+                    self._memory.move_to_end(key)
+                    return dict(result)
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT expires, result FROM rdap_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.debug(f"读取RDAP缓存时出错: {e}")
+                    return None
+                if row is not None and row[0] > now:
+                    result = json.loads(row[1])
+                    self._remember(key, row[0], result)
+                    return dict(result)
+
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        缓存查询结果，非确定性结果(超时、限流等)不缓存
+
+        参数:
+            key: 缓存键
+            result: 查询结果字典
+        """
+        with self._lock:
+            ttl = CACHE_TTL.get(result['status'])
+            if ttl is None:
+                return
+
+            expires = time.time() + ttl
+            result = dict(result)
+            self._remember(key, expires, result)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO rdap_cache (key, expires, result) VALUES (?, ?, ?)",
+                        (key, expires, json.dumps(result, ensure_ascii=False))
+                    )
+                    self._pending_writes += 1
+                    if self._pending_writes >= CACHE_COMMIT_INTERVAL:
+                        self._db.commit()
+                        self._pending_writes = 0
+                except sqlite3.Error as e:
+                    logger.debug(f"写入RDAP缓存时出错: {e}")
+
+    def _remember(self, key: str, expires: float, result: Dict[str, Any]) -> None:
+        """写入内存缓存，超出容量时淘汰最久未使用的条目"""
+        self._memory[key] = (expires, result)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """提交未写入的结果并关闭缓存文件"""
+        with self._lock:
+            if self._db is not None:
+                try:
+                    self._db.commit()
+                    self._db.close()
+                except sqlite3.Error as e:
+                    logger.debug(f"关闭RDAP缓存文件时出错: {e}")
+                self._db = None
+
 
 class RdapClient:
     """增强的RDAP客户端，支持特定TLD直接查询和通用TLD查询"""
 
     def __init__(self, max_retries: int = 2, timeout: int = 10,
-                user_agent: Optional[str] = None, prefer_direct: bool = True):
+                user_agent: Optional[str] = None, prefer_direct: bool = True,
+                cache_path: Optional[str] = None,
+                bootstrap_cache: Optional[str] = BOOTSTRAP_CACHE_FILE,
+                query_delay: float = 0.0):
         """
         初始化RDAP客户端
 
@@ -69,10 +399,14 @@ class RdapClient:
             timeout: 请求超时时间(秒)
             user_agent: 自定义User-Agent字符串
             prefer_direct: 是否优先使用直接RDAP服务器 (对于已知TLD)
+            cache_path: 查询结果缓存文件路径，为空时只在内存中缓存
+            bootstrap_cache: IANA引导数据缓存文件路径，为空时每次启动都重新下载
+            query_delay: 对同一服务器两次查询的最小间隔(秒)，与SERVER_DELAY取较大值
         """
         self.max_retries = max_retries
         self.timeout = timeout
         self.prefer_direct = prefer_direct
+        self.query_delay = query_delay
 
         # 设置默认请求头
         self.headers = {
@@ -80,22 +414,42 @@ class RdapClient:
             'Accept': 'application/rdap+json'
         }
 
-        # 用于记录每个服务器的最后查询时间
-        self.last_query_time: Dict[str, float] = {}
+        # 每个RDAP服务器主机的限速令牌桶 (共用同一服务器的TLD共用一个令牌桶)
+        self.buckets: Dict[str, TokenBucket] = {}
 
-        # 会话对象，用于保持连接
-        self.session = requests.Session()
+        # 每个服务器使用的请求方法，不支持HEAD的服务器改用只取1字节的GET
+        self.method_for_server: Dict[str, str] = {}
+        self._range_headers = dict(self.headers, Range='bytes=0-0')
+
+        # 会话对象，用于保持连接 (共享模块级连接池)
+        self.session = _SESSION
 
         # 已知的TLD缓存，避免重复查询
         self.known_tlds: Set[str] = set(DIRECT_RDAP_SERVERS.keys())
 
+        # RDAP.org确认没有RDAP服务的TLD
+        self.known_bad_tlds: Set[str] = set()
+
+        # 查询结果缓存
+        self.cache = ResultCache(cache_path)
+
+        # IANA引导数据中的TLD -> RDAP基础URL，首次需要时加载
+        self.bootstrap_cache = bootstrap_cache
+        self._bootstrap_servers: Optional[Dict[str, str]] = None
+        # get_supported_tlds的结果
+        self._supported_tlds: Optional[FrozenSet[str]] = None
+        self._lock = threading.Lock()
+
+        # 关闭客户端或中断扫描时设置，唤醒在令牌桶或重试退避中等待的工作线程
+        self._stop = threading.Event()
+
         logger.info("RDAP客户端初始化完成")
         if prefer_direct:
             logger.info("优先使用特定TLD的RDAP服务器")
         else:
             logger.info("优先使用RDAP.org作为查询入口")
 
-    def check_domain(self, domain: str, retry_count: int = 0) -> Dict[str, Any]:
+    def check_domain(self, domain: str, force_refresh: bool = False) -> Dict[str, Any]:
         """
         检查域名可用性
 
@@ -104,7 +458,7 @@ class RdapClient:
 
         参数:
             domain: 完整域名 (例如: 'example.com')
-            retry_count: 内部重试计数
+            force_refresh: 忽略缓存，强制重新查询
 
         返回:
             包含查询结果的字典:
@@ -117,27 +471,17 @@ class RdapClient:
                 'raw_code': HTTP状态码,
                 'response_time': 响应时间(毫秒),
                 'error': 错误信息 (如有),
-                'rdap_server': 使用的RDAP服务器
+                'rdap_server': 使用的RDAP服务器,
+                'cached': 是否未发送请求 (命中结果缓存或TLD已知无RDAP服务时存在),
+                'cache_hit': 是否命中结果缓存 (仅命中时存在)
             }
         """
         # 格式化域名(转为小写)
         domain = domain.lower()
 
-        # 准备结果字典
-        result = {
-            'domain': domain,
-            'available': False,
-            'status': 'unknown',
-            'status_cn': '未知状态',
-            'tld': None,
-            'raw_code': None,
-            'response_time': None,
-            'error': None,
-            'rdap_server': None
-        }
-
         # 验证域名格式
         if not self._is_valid_domain(domain):
+            result = self._new_result(domain)
             result['status'] = 'invalid_domain'
             result['status_cn'] = '无效的域名格式'
             result['error'] = f'域名 {domain} 格式无效'
@@ -145,197 +489,382 @@ class RdapClient:
 
         # 提取TLD
         tld = self._extract_tld(domain)
-        result['tld'] = tld
 
-        # 确定使用哪个RDAP服务器
-        rdap_url, server_type = self._get_rdap_server_url(domain, tld)
-        result['rdap_server'] = server_type
+        # 已确认没有RDAP服务的TLD无需再发送请求
+        if tld in self.known_bad_tlds:
+            result = self._new_result(domain, tld, 'rdap.org')
+            self._mark_no_rdap_service(result, tld)
+            result['cached'] = True
+            return result
+
+        # 确定使用哪个RDAP服务器，直接服务器重试都失败时改用RDAP.org
+        servers = [self._get_rdap_server_url(domain, tld)]
+        if servers[0][1].startswith('direct_'):
+            servers.append((RDAP_ORG_URL.format(domain=domain), 'rdap.org'))
 
-        # 确保请求间隔 (防止速率限制)
-        self._ensure_query_delay(server_type)
+        for index, (rdap_url, server_type) in enumerate(servers):
+            if index:
+                logger.warning(f"直接查询{domain}失败，尝试使用RDAP.org...")
+            result = self._query_server(domain, tld, rdap_url, server_type, force_refresh)
+            if result['status'] not in FALLBACK_STATUSES:
+                break
 
-        # 记录开始时间
-        start_time = time.time()
+        return result
 
-        try:
-            # 发送HEAD请求
-            response = self.session.head(
-                rdap_url,
-                headers=self.headers,
-                timeout=self.timeout,
-                allow_redirects=False  # 不自动跟随重定向，手动处理
-            )
+    def check_domains(self, domains: Iterable[str], force_refresh: bool = False,
+                      workers_per_host: int = HOST_WORKERS,
+                      max_pending: int = MAX_PENDING) -> Iterator[Dict[str, Any]]:
+        """
+        并发检查多个域名，按完成顺序产出结果
 
-            # 更新最后查询时间
-            self.last_query_time[server_type] = time.time()
-
-            # 计算响应时间 (毫秒)
-            response_time = (time.time() - start_time) * 1000
-            result['response_time'] = round(response_time, 2)
-
-            # 获取状态码
-            status_code = response.status_code
-            result['raw_code'] = status_code
-
-            # 处理RDAP.org的响应
-            if server_type == 'rdap.org':
-                if status_code == 302:
-                    # RDAP.org知道有RDAP服务，跟随重定向
-                    redirect_url = response.headers.get('Location')
-                    if redirect_url:
-                        logger.debug(f"RDAP.org重定向到: {redirect_url}")
-                        result['redirect_url'] = redirect_url
-
-                        # 确保请求间隔
-                        time.sleep(0.5)
-
-                        try:
-                            # 发送请求到重定向目标
-                            redirect_response = self.session.head(
-                                redirect_url,
-                                headers=self.headers,
-                                timeout=self.timeout
-                            )
-
-                            # 使用重定向目标的状态码
-                            status_code = redirect_response.status_code
-                            result['raw_code'] = status_code
-                            result['rdap_server'] = 'redirect_target'
-
-                            # 解析重定向目标的状态码
-                            if status_code == 404:
-                                # 大多数RDAP服务器用404表示域名未注册
-                                result['status'] = 'available'
-                                result['status_cn'] = '可以注册'
-                                result['available'] = True
-                            elif status_code in STATUS_CODES:
-                                # 使用预定义的状态码解释
-                                status_info = STATUS_CODES[status_code].copy()
-                                result.update(status_info)
-                            else:
-                                # 未知状态码
-                                result['status'] = 'unknown_status_code'
-                                result['status_cn'] = f'未知状态码: {status_code}'
-                                result['error'] = f'RDAP服务器返回未知状态码: {status_code}'
-
-                        except Exception as e:
-                            logger.warning(f"跟随重定向时出错: {e}")
-                            result['status'] = 'redirect_error'
-                            result['status_cn'] = '重定向错误'
-                            result['error'] = f'跟随重定向时出错: {e}'
-
-                elif status_code == 404:
-                    # RDAP.org不知道有RDAP服务，表示该TLD没有已知的RDAP服务
-                    result['status'] = 'no_rdap_service'
-                    result['status_cn'] = 'TLD无已知RDAP服务'
-                    result['available'] = False
-                    result['error'] = f'{tld}没有已知的RDAP服务，无法通过RDAP确认域名状态'
-
-                elif status_code in STATUS_CODES:
-                    # 对于其他状态码使用预定义解释
-                    status_info = STATUS_CODES[status_code].copy()
-                    result.update(status_info)
+        每个RDAP服务器使用独立的线程池和令牌桶，某个服务器变慢或限流退避时
+        只会阻塞发往该服务器的查询，其他服务器的查询照常进行
 
+        参数:
+            domains: 完整域名的可迭代对象 (按需读取，不会一次全部展开)
+            force_refresh: 忽略缓存，强制重新查询
+            workers_per_host: 每个服务器的工作线程数
+            max_pending: 同时在途的最大查询数
+
+        生成:
+            与check_domain相同格式的结果字典
+        """
+        executors: Dict[str, ThreadPoolExecutor] = {}
+        # 每个服务器最多提交workers_per_host个查询，其余在该服务器的队列中等待，
+        # 这样某个服务器限流退避时不会占满全部在途名额，其他服务器的查询可以继续轮转
+        backlog: Dict[str, deque] = {}
+        inflight: Dict[str, int] = {}
+        pending: Dict[Any, str] = {}
+        queued = 0
+
+        def submit(host: str, domain: str) -> None:
+            executor = executors.get(host)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=workers_per_host,
+                                              thread_name_prefix=f"rdap-{host or 'invalid'}")
+                executors[host] = executor
+            pending[executor.submit(self.check_domain, domain, force_refresh)] = host
+            inflight[host] = inflight.get(host, 0) + 1
+
+        def collect() -> Iterator[Dict[str, Any]]:
+            nonlocal queued
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                host = pending.pop(future)
+                inflight[host] -= 1
+                # 该服务器空出一个名额，提交它队列中的下一个查询
+                waiting = backlog.get(host)
+                if waiting:
+                    submit(host, waiting.popleft())
+                    queued -= 1
+                yield future.result()
+
+        try:
+            for domain in domains:
+                host = self._host_for(domain)
+                if inflight.get(host, 0) < workers_per_host:
+                    submit(host, domain)
                 else:
-                    # 未知状态码
-                    result['status'] = 'unknown_status_code'
-                    result['status_cn'] = f'未知状态码: {status_code}'
-                    result['error'] = f'RDAP.org返回未知状态码: {status_code}'
+                    backlog.setdefault(host, deque()).append(domain)
+                    queued += 1
+
+                # 在途和排队的查询达到上限时，先取出已完成的结果
+                while len(pending) + queued >= max_pending:
+                    yield from collect()
+
+            while pending:
+                yield from collect()
+        except (KeyboardInterrupt, SystemExit):
+            # Ctrl+C或守护进程收到SIGTERM: 让等待中的查询立即结束，下面的shutdown不必等待退避
+            self._stop.set()
+            raise
+        finally:
+            # 提前结束迭代时取消尚未开始的查询
+            for executor in executors.values():
+                executor.shutdown(wait=True, cancel_futures=True)
 
-            # 对于直接RDAP服务器的响应
-            else:
-                if status_code in STATUS_CODES:
-                    status_info = STATUS_CODES[status_code].copy()
-                    result.update(status_info)
+    def _host_for(self, domain: str) -> str:
+        """
+        确定域名查询将发往的RDAP服务器主机名
+
+        参数:
+            domain: 完整域名
+
+        返回:
+            主机名，域名格式无效时返回空字符串
+        """
+        domain = domain.lower()
+        if not self._is_valid_domain(domain):
+            return ''
+        url, _ = self._get_rdap_server_url(domain, self._extract_tld(domain))
+        return urlsplit(url).netloc
+
+    def _new_result(self, domain: str, tld: Optional[str] = None,
+                    server_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        创建初始查询结果字典
+
+        参数:
+            domain: 完整域名
+            tld: 顶级域名
+            server_type: 服务器类型标识
+
+        返回:
+            状态未知的结果字典
+        """
+        return {
+            'domain': domain,
+            'available': False,
+            'status': 'unknown',
+            'status_cn': '未知状态',
+            'tld': tld,
+            'raw_code': None,
+            'response_time': None,
+            'error': None,
+            'rdap_server': server_type
+        }
+
+    def _query_server(self, domain: str, tld: str, rdap_url: str,
+                      server_type: str, force_refresh: bool) -> Dict[str, Any]:
+        """
+        向一个RDAP服务器查询域名，失败时在循环中重试
+
+        参数:
+            domain: 完整域名
+            tld: 顶级域名
+            rdap_url: 查询URL
+            server_type: 服务器类型标识
+            force_refresh: 忽略缓存，强制重新查询
+
+        返回:
+            查询结果字典
+        """
+        # 缓存命中时无需发送请求
+        cache_key = f"{domain}|{server_type}"
+        if not force_refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached['cached'] = True
+                # 与已知无RDAP服务TLD的直接返回区分，统计只计入真正的缓存命中
+                cached['cache_hit'] = True
+                return cached
+
+        retry_count = 0
+        while True:
+            # 每次尝试都从干净的结果开始，避免残留上一次的错误信息
+            result = self._new_result(domain, tld, server_type)
+
+            # 确保请求间隔 (防止速率限制)
+            bucket = self._ensure_query_delay(rdap_url, server_type)
+
+            # 记录开始时间
+            start_time = time.time()
+
+            try:
+                # 发送HEAD请求 (服务器不支持时改用GET)
+                method = self.method_for_server.get(server_type, 'HEAD')
+                response = self._send(method, rdap_url)
+                if response.status_code == 405 and method == 'HEAD':
+                    logger.info(f"{server_type} 不支持HEAD请求，改用GET查询")
+                    self.method_for_server[server_type] = 'GET'
+                    # 改用GET重新查询是第二次请求，同样需要取得令牌
+                    bucket.acquire()
+                    response = self._send('GET', rdap_url)
+
+                # 计算响应时间 (毫秒)
+                response_time = (time.time() - start_time) * 1000
+                result['response_time'] = round(response_time, 2)
+
+                # 获取状态码
+                status_code = response.status_code
+                result['raw_code'] = status_code
+                retry_after = response.headers.get('Retry-After')
+
+                # RDAP.org的302/404有特殊含义，其余状态码统一按STATUS_CODES解释
+                handler = self._RDAP_ORG_HANDLERS.get(status_code) if server_type == 'rdap.org' else None
+                if handler is not None:
+                    handled = handler(self, result, response, tld)
+                    if handled is not response:
+                        # RDAP.org的302本身是一次未被限流的响应: 先按它的限流响应头调整RDAP.org的令牌桶
+                        # (同时重置连续限流计数)，重定向目标的响应再记到目标服务器的令牌桶上
+                        bucket.observe(response.headers)
+                        bucket = self._bucket_for(result['redirect_url'], 'redirect_target')
+                    response = handled
+                    status_code = response.status_code
+                    retry_after = response.headers.get('Retry-After')
                 else:
-                    result['status'] = 'unknown_status_code'
-                    result['status_cn'] = f'未知状态码: {status_code}'
-                    result['error'] = f'RDAP服务器返回未知状态码: {status_code}'
+                    source = 'RDAP.org' if server_type == 'rdap.org' else 'RDAP服务器'
+                    self._apply_status(result, status_code, source)
+
+                # 服务器限流或暂不可用时暂停该服务器的令牌桶 (按Retry-After或连续限流次数指数退避)，
+                # 重试时在_ensure_query_delay中等待；其他响应按限流响应头调整
+                if status_code in RETRY_STATUS_CODES:
+                    delay = bucket.penalize(self._parse_retry_after(retry_after))
+                    if retry_count < self.max_retries:
+                        logger.warning(f"查询{domain}返回{status_code}，{delay:.1f}秒后重试 ({retry_count + 1}/{self.max_retries})...")
+                        retry_count += 1
+                        continue
+                else:
+                    bucket.observe(response.headers)
+
+                self.cache.put(cache_key, result)
+                return result
+
+            except QueryCancelled:
+                # 客户端已关闭，不再重试
+                raise
+
+            except requests.exceptions.Timeout:
+                # 处理超时错误
+                result['status'] = 'timeout'
+                result['status_cn'] = '查询超时'
+                result['error'] = f'连接{rdap_url}超时 ({self.timeout}秒)'
+                failure = f"查询{domain}超时"
+
+            except requests.exceptions.ConnectionError as e:
+                # 处理连接错误
+                result['status'] = 'connection_error'
+                result['status_cn'] = '连接错误'
+                result['error'] = f'连接到{rdap_url}时发生错误: {str(e)}'
+                failure = f"连接到{domain}时出错"
+
+            except Exception as e:
+                # 处理其他错误
+                result['status'] = 'error'
+                result['status_cn'] = '查询错误'
+                result['error'] = f'查询{domain}时发生错误: {str(e)}'
+                failure = f"查询{domain}时发生错误"
+
+            # 重试次数用尽时返回最后一次的错误结果
+            if retry_count >= self.max_retries:
+                return result
+
+            logger.warning(f"{failure}，正在重试 ({retry_count + 1}/{self.max_retries})...")
+            # 指数退避后重试，客户端关闭时立即结束
+            if self._stop.wait(self._retry_delay(retry_count)):
+                raise QueryCancelled("RDAP客户端已关闭，取消等待重试的查询")
+            retry_count += 1
+
+    def _send(self, method: str, url: str) -> requests.Response:
+        """
+        发送RDAP查询请求
 
-            return result
+        GET请求带上Range: bytes=0-0，支持范围请求的服务器只返回1字节内容
 
-        except requests.exceptions.Timeout:
-            # 处理超时错误
-            result['status'] = 'timeout'
-            result['status_cn'] = '查询超时'
-            result['error'] = f'连接{rdap_url}超时 ({self.timeout}秒)'
+        参数:
+            method: 请求方法 ('HEAD' 或 'GET')
+            url: 查询URL
 
-            # 尝试重试
-            if retry_count < self.max_retries:
-                logger.warning(f"查询{domain}超时，正在重试 ({retry_count + 1}/{self.max_retries})...")
-                time.sleep(1)  # 重试前等待1秒
-                return self.check_domain(domain, retry_count + 1)
+        返回:
+            响应对象
+        """
+        return self.session.request(
+            method,
+            url,
+            headers=self.headers if method == 'HEAD' else self._range_headers,
+            timeout=self.timeout,
+            allow_redirects=False  # 不自动跟随重定向，手动处理
+        )
+
+    def _apply_status(self, result: Dict[str, Any], status_code: int, source: str) -> None:
+        """
+        按HTTP状态码填写查询结果
 
-            # 如果重试都失败并且是使用直接服务器，尝试使用RDAP.org
-            elif server_type.startswith('direct_') and self.prefer_direct:
-                logger.warning(f"直接查询{domain}失败，尝试使用RDAP.org...")
-                # 临时关闭prefer_direct标志
-                old_prefer = self.prefer_direct
-                self.prefer_direct = False
-                try:
-                    return self.check_domain(domain, 0)  # 重置重试计数
-                finally:
-                    # 恢复原始设置
-                    self.prefer_direct = old_prefer
-
-        except requests.exceptions.ConnectionError as e:
-            # 处理连接错误
-            result['status'] = 'connection_error'
-            result['status_cn'] = '连接错误'
-            result['error'] = f'连接到{rdap_url}时发生错误: {str(e)}'
-
-            # 尝试重试
-            if retry_count < self.max_retries:
-                logger.warning(f"连接到{domain}时出错，正在重试 ({retry_count + 1}/{self.max_retries})...")
-                time.sleep(1)  # 重试前等待1秒
-                return self.check_domain(domain, retry_count + 1)
-
-            # 如果重试都失败并且是使用直接服务器，尝试使用RDAP.org
-            elif server_type.startswith('direct_') and self.prefer_direct:
-                logger.warning(f"直接查询{domain}失败，尝试使用RDAP.org...")
-                # 临时关闭prefer_direct标志
-                old_prefer = self.prefer_direct
-                self.prefer_direct = False
-                try:
-                    return self.check_domain(domain, 0)  # 重置重试计数
-                finally:
-                    # 恢复原始设置
-                    self.prefer_direct = old_prefer
+        参数:
+            result: 查询结果字典
+            status_code: HTTP状态码
+            source: 响应来源名称，用于未知状态码的错误信息
+        """
+        status_info = STATUS_CODES.get(status_code)
+        if status_info is not None:
+            # 使用预定义的状态码解释，直接写入字段
+            result['available'], result['status'], result['status_cn'] = status_info
+        else:
+            # 未知状态码
+            result['status'] = 'unknown_status_code'
+            result['status_cn'] = f'未知状态码: {status_code}'
+            result['error'] = f'{source}返回未知状态码: {status_code}'
 
-        except Exception as e:
-            # 处理其他错误
-            result['status'] = 'error'
-            result['status_cn'] = '查询错误'
-            result['error'] = f'查询{domain}时发生错误: {str(e)}'
+    def _handle_rdap_org_redirect(self, result: Dict[str, Any],
+                                  response: requests.Response, tld: str) -> requests.Response:
+        """
+        处理RDAP.org的302响应: RDAP.org知道该TLD的RDAP服务，跟随重定向
 
-            # 尝试重试
-            if retry_count < self.max_retries:
-                logger.warning(f"查询{domain}时发生错误，正在重试 ({retry_count + 1}/{self.max_retries})...")
-                time.sleep(1)  # 重试前等待1秒
-                return self.check_domain(domain, retry_count + 1)
+        参数:
+            result: 查询结果字典
+            response: RDAP.org的响应
+            tld: 顶级域名
 
-            # 如果重试都失败并且是使用直接服务器，尝试使用RDAP.org
-            elif server_type.startswith('direct_') and self.prefer_direct:
-                logger.warning(f"直接查询{domain}失败，尝试使用RDAP.org...")
-                # 临时关闭prefer_direct标志
-                old_prefer = self.prefer_direct
-                self.prefer_direct = False
-                try:
-                    return self.check_domain(domain, 0)  # 重置重试计数
-                finally:
-                    # 恢复原始设置
-                    self.prefer_direct = old_prefer
+        返回:
+            决定查询结果的响应 (重定向目标的响应，无法跟随时为原响应)
+        """
+        redirect_url = response.headers.get('Location')
+        if not redirect_url:
+            return response
 
-        finally:
-            # 无论成功失败，都更新最后查询时间
-            self.last_query_time[server_type] = time.time()
+        logger.debug("RDAP.org重定向到: %s", redirect_url)
+        result['redirect_url'] = redirect_url
 
-        return result
+        # 重定向目标按其所在服务器的令牌桶限速
+        self._ensure_query_delay(redirect_url, 'redirect_target')
+
+        try:
+            # 发送请求到重定向目标
+            redirect_response = self.session.head(
+                redirect_url,
+                headers=self.headers,
+                timeout=self.timeout
+            )
+        except Exception as e:
+            logger.warning(f"跟随重定向时出错: {e}")
+            result['status'] = 'redirect_error'
+            result['status_cn'] = '重定向错误'
+            result['error'] = f'跟随重定向时出错: {e}'
+            return response
+
+        # 使用重定向目标的状态码 (大多数RDAP服务器用404表示域名未注册)
+        result['raw_code'] = redirect_response.status_code
+        result['rdap_server'] = 'redirect_target'
+        self._apply_status(result, redirect_response.status_code, 'RDAP服务器')
+        return redirect_response
+
+    def _handle_rdap_org_not_found(self, result: Dict[str, Any],
+                                   response: requests.Response, tld: str) -> requests.Response:
+        """
+        处理RDAP.org的404响应: RDAP.org不知道该TLD的RDAP服务
+
+        参数:
+            result: 查询结果字典
+            response: RDAP.org的响应
+            tld: 顶级域名
+
+        返回:
+            原响应
+        """
+        self._mark_no_rdap_service(result, tld)
+        # 记住该TLD，之后同一TLD的域名直接返回结果
+        self.known_bad_tlds.add(tld)
+        return response
+
+    def _mark_no_rdap_service(self, result: Dict[str, Any], tld: str) -> None:
+        """将结果标记为TLD无已知RDAP服务"""
+        result['status'] = 'no_rdap_service'
+        result['status_cn'] = 'TLD无已知RDAP服务'
+        result['available'] = False
+        result['error'] = f'{tld}没有已知的RDAP服务，无法通过RDAP确认域名状态'
+
+    # RDAP.org特殊状态码的处理方法分派表
+    _RDAP_ORG_HANDLERS = {
+        302: _handle_rdap_org_redirect,
+        404: _handle_rdap_org_not_found,
+    }
 
     def _check_tld_via_iana(self, tld: str) -> Dict[str, Any]:
         """
         通过IANA RDAP服务检查TLD是否存在和是否支持RDAP
 
+        先查已加载的IANA引导数据，只有引导数据中没有的TLD才需要单独查询IANA
+
         参数:
             tld: 顶级域名 (例如: '.com')
 
@@ -350,6 +879,14 @@ class RdapClient:
         # 去掉开头的点
         tld_name = tld[1:] if tld.startswith('.') else tld
 
+        # 引导数据中列出的TLD一定存在且有RDAP服务，直接在内存中回答
+        if f'.{tld_name.lower()}' in self._get_bootstrap_servers():
+            return {
+                'exists': True,
+                'has_rdap': True,
+                'status': 'has_rdap'
+            }
+
         # 构建IANA RDAP URL
         iana_url = RDAP_IANA_URL.format(domain=tld_name)
 
@@ -361,7 +898,7 @@ class RdapClient:
 
         try:
             # 确保请求间隔
-            self._ensure_query_delay('iana')
+            self._ensure_query_delay(iana_url, 'iana')
 
             # 发送请求
             response = self.session.get(
@@ -370,9 +907,6 @@ class RdapClient:
                 timeout=self.timeout
             )
 
-            # 更新最后查询时间
-            self.last_query_time['iana'] = time.time()
-
             # 如果状态码为200，表示TLD存在
             if response.status_code == 200:
                 result['exists'] = True
@@ -415,13 +949,94 @@ class RdapClient:
             元组 (RDAP服务器URL, 服务器类型)
         """
         # 对于已知TLD，根据prefer_direct设置决定使用哪个服务器
-        if tld in DIRECT_RDAP_SERVERS:
-            if self.prefer_direct:
+        if self.prefer_direct:
+            if tld in DIRECT_RDAP_SERVERS:
                 return DIRECT_RDAP_SERVERS[tld].format(domain=domain), f'direct_{tld}'
 
+            # 引导数据中有该TLD的RDAP服务器时直接查询，省去RDAP.org的重定向往返
+            base_url = self._get_bootstrap_servers().get(tld)
+            if base_url:
+                return f"{base_url}domain/{domain}", f'direct_{tld}'
+
         # 对于其他TLD或当prefer_direct为False时，使用RDAP.org
         return RDAP_ORG_URL.format(domain=domain), 'rdap.org'
 
+    def _get_bootstrap_servers(self) -> Dict[str, str]:
+        """
+        获取IANA引导数据中的TLD到RDAP基础URL映射 (首次调用时加载)
+
+        返回:
+            {'.tld': 'https://rdap服务器/路径/'} 字典
+        """
+        if self._bootstrap_servers is None:
+            # 批量查询时多个线程可能同时首次访问，只加载一次
+            with self._lock:
+                if self._bootstrap_servers is None:
+                    self._bootstrap_servers = self._load_bootstrap_servers()
+        return self._bootstrap_servers
+
+    def _load_bootstrap_servers(self) -> Dict[str, str]:
+        """
+        加载IANA引导数据中的TLD到RDAP基础URL映射
+
+        优先使用未过期的本地缓存，否则下载并写回缓存；
+        下载失败时退回过期的缓存，都不可用时返回空字典 (即全部经由RDAP.org查询)
+
+        返回:
+            {'.tld': 'https://rdap服务器/路径/'} 字典
+        """
+        cache_file = os.path.expanduser(self.bootstrap_cache) if self.bootstrap_cache else None
+        data = None
+        stale = None
+
+        if cache_file:
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    cached = json.load(f)
+                if time.time() - os.path.getmtime(cache_file) < BOOTSTRAP_CACHE_TTL:
+                    data = cached
+                else:
+                    stale = cached
+            except (OSError, ValueError):
+                pass
+
+        if data is None:
+            try:
+                response = self.session.get(RDAP_BOOTSTRAP_URL, timeout=self.timeout)
+                response.raise_for_status()
+                data = response.json()
+                logger.info("已下载IANA RDAP引导数据")
+                if cache_file:
+                    try:
+                        directory = os.path.dirname(cache_file)
+                        if directory:
+                            os.makedirs(directory, exist_ok=True)
+                        with open(cache_file, 'w', encoding='utf-8') as f:
+                            json.dump(data, f)
+                    except OSError as e:
+                        logger.debug(f"写入RDAP引导数据缓存失败: {e}")
+            except Exception as e:
+                logger.warning(f"获取IANA RDAP引导数据失败: {e}")
+                data = stale
+
+        servers: Dict[str, str] = {}
+        try:
+            for tlds, urls in (data or {}).get('services', []):
+                # 优先使用https地址
+                url = next((u for u in urls if u.startswith('https://')), urls[0] if urls else None)
+                if not url:
+                    continue
+                if not url.endswith('/'):
+                    url += '/'
+                for name in tlds:
+                    servers[f'.{name.lower()}'] = url
+        except (TypeError, ValueError, AttributeError) as e:
+            logger.warning(f"解析IANA RDAP引导数据失败: {e}")
+            servers = {}
+
+        logger.info(f"RDAP引导数据包含 {len(servers)} 个TLD")
+        return servers
+
     def _is_direct_supported_tld(self, tld: str) -> bool:
         """
         检查TLD是否有直接支持的RDAP服务器
@@ -444,10 +1059,11 @@ class RdapClient:
         返回:
             顶级域名 (例如: '.com')
         """
-        # 简单实现：获取最后一个点之后的部分
-        parts = domain.split('.')
-        if len(parts) >= 2:
-            return f'.{parts[-1]}'
+        # 取最后一个点及之后的部分，无需split分配整个标签列表
+        # RDAP按顶级标签划分注册局 (如.co.uk由.uk的服务器响应)，因此只取最后一级
+        dot = domain.rfind('.')
+        if dot >= 0:
+            return domain[dot:]
 
         # 无法确定TLD
         return ''
@@ -465,50 +1081,161 @@ class RdapClient:
         # 使用预编译的正则表达式进行验证
         return bool(DOMAIN_REGEX.match(domain))
 
-    def _ensure_query_delay(self, server_type: str) -> None:
+    def _retry_delay(self, retry_count: int) -> float:
         """
-        确保对同一服务器的查询有足够的时间间隔
+        计算请求失败(超时、连接错误等)后重试前的等待时间，使用带随机抖动的指数退避
+
+        参数:
+            retry_count: 已重试次数
+
+        返回:
+            等待时间(秒)
+        """
+        backoff = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** retry_count)
+        return backoff * (0.5 + random.random() / 2)
+
+    def _parse_retry_after(self, retry_after: Optional[str]) -> Optional[float]:
+        """
+        解析Retry-After响应头
+
+        参数:
+            retry_after: Retry-After响应头的值 (秒数或HTTP日期)
+
+        返回:
+            等待时间(秒，不超过RETRY_AFTER_MAX)，无法解析或不需要等待时返回None
+        """
+        if not retry_after:
+            return None
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        if delay > 0:
+            return min(delay, RETRY_AFTER_MAX)
+        return None
+
+    def _ensure_query_delay(self, url: str, server_type: str) -> TokenBucket:
+        """
+        确保对同一服务器的查询频率不超过限制
         防止触发RDAP服务器的速率限制
 
+        每个服务器主机使用一个令牌桶，服务器空闲时积累令牌，
+        短时间内的少量查询可以直接发出，令牌耗尽后才按间隔等待
+
+        参数:
+            url: 即将请求的URL
+            server_type: 服务器类型标识，用于查找查询间隔配置
+
+        返回:
+            该服务器主机的令牌桶
+        """
+        bucket = self._bucket_for(url, server_type)
+        bucket.acquire()
+        return bucket
+
+    def _bucket_for(self, url: str, server_type: str) -> TokenBucket:
+        """
+        获取URL所在主机的令牌桶
+
+        多个TLD由同一服务器提供RDAP服务时 (如.com和.net都在rdap.verisign.com)，
+        共用一个令牌桶，查询间隔按首次创建时的服务器类型配置
+
         参数:
+            url: 请求URL
             server_type: 服务器类型标识
+
+        返回:
+            令牌桶
         """
-        if server_type in self.last_query_time:
-            last_time = self.last_query_time[server_type]
-            now = time.time()
-            elapsed = now - last_time
+        host = urlsplit(url).netloc
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            # setdefault保证并发创建时所有线程拿到同一个令牌桶
+            bucket = self.buckets.setdefault(
+                host, TokenBucket(rate=1.0 / self._server_delay(server_type), stop=self._stop)
+            )
+        return bucket
 
-            # 根据服务器类型获取延迟配置
-            delay = SERVER_DELAY.get('default', 1.0)  # 默认延迟
+    def _server_delay(self, server_type: str) -> float:
+        """
+        获取服务器的查询间隔配置
 
-            # 检查是否有特定服务器的延迟配置
-            if server_type in SERVER_DELAY:
-                delay = SERVER_DELAY[server_type]
-            # 对于direct_开头的服务器，尝试获取对应TLD的延迟
-            elif server_type.startswith('direct_'):
-                tld = server_type[7:]  # 去掉'direct_'前缀
-                if tld in SERVER_DELAY:
-                    delay = SERVER_DELAY[tld]
+        参数:
+            server_type: 服务器类型标识
 
-            if elapsed < delay:
-                sleep_time = delay - elapsed
-                time.sleep(sleep_time)
+        返回:
+            查询间隔(秒)
+        """
+        delay = SERVER_DELAY.get('default', 1.0)  # 默认延迟
 
-    def get_supported_tlds(self) -> List[str]:
+        # 检查是否有特定服务器的延迟配置
+        if server_type in SERVER_DELAY:
+            delay = SERVER_DELAY[server_type]
+        # 对于direct_开头的服务器，尝试获取对应TLD的延迟
+        elif server_type.startswith('direct_'):
+            tld = server_type[7:]  # 去掉'direct_'前缀
+            if tld in SERVER_DELAY:
+                delay = SERVER_DELAY[tld]
+
+        return max(delay, self.query_delay)
+
+    def warm_up(self, tlds: List[str]) -> None:
+        """
+        在后台预先与要查询的RDAP服务器建立TLS连接 (尽力而为，不等待完成)
+
+        首次查询时连接池中已有可复用的连接，省去握手延迟；
+        预热请求同样从各服务器主机的令牌桶中取得令牌
+
+        参数:
+            tlds: 将要扫描的顶级域名列表
+        """
+        hosts: Dict[str, str] = {}
+        for tld in tlds:
+            url, server_type = self._get_rdap_server_url(f"example{tld}", tld)
+            parts = urlsplit(url)
+            hosts.setdefault(f"{parts.scheme}://{parts.netloc}/", server_type)
+
+        for base_url, server_type in hosts.items():
+            threading.Thread(target=self._warm_host, args=(base_url, server_type), daemon=True).start()
+        logger.debug(f"正在预热 {len(hosts)} 个RDAP服务器连接")
+
+    def _warm_host(self, base_url: str, server_type: str) -> None:
+        """按令牌桶限速向服务器根路径发送一次HEAD请求，使连接进入连接池"""
+        try:
+            self._ensure_query_delay(base_url, server_type)
+            self.session.head(base_url, headers=self.headers,
+                              timeout=WARMUP_TIMEOUT, allow_redirects=False)
+        except Exception as e:
+            logger.debug(f"预热连接 {base_url} 失败: {e}")
+
+    def get_supported_tlds(self) -> FrozenSet[str]:
         """
-        获取已知支持的顶级域名列表
+        获取已知支持的顶级域名集合
         注意：通过RDAP.org，理论上支持所有注册了RDAP服务的TLD
 
+        包括直接查询的TLD和IANA引导数据中有RDAP服务的TLD，结果在实例内缓存
+
         返回:
-            支持的顶级域名列表
+            支持的顶级域名集合
         """
-        # 返回直接支持的TLD加上一个通用说明
-        direct_tlds = list(DIRECT_RDAP_SERVERS.keys())
-        logger.info(f"直接支持的TLD: {', '.join(direct_tlds)}")
-        logger.info("通过RDAP.org理论上支持所有注册了RDAP服务的TLD")
-        return direct_tlds
+        if self._supported_tlds is None:
+            direct_tlds = list(DIRECT_RDAP_SERVERS.keys())
+            logger.info(f"直接支持的TLD: {', '.join(direct_tlds)}")
+            logger.info("通过RDAP.org理论上支持所有注册了RDAP服务的TLD")
+            self._supported_tlds = frozenset(direct_tlds).union(self._get_bootstrap_servers())
+        return self._supported_tlds
 
     def close(self) -> None:
-        """关闭连接会话"""
-        if self.session:
+        """
+        关闭连接会话
+
+        共享会话在进程内保持打开，供后续客户端实例复用已建立的连接；
+        仍在等待令牌或重试的查询以QueryCancelled结束
+        """
+        self._stop.set()
+        if self.session and self.session is not _SESSION:
             self.session.close()
+        self.cache.close()
@@ -9,12 +9,9 @@ scanner.py
 """
 
 import time
-import sys
 import os
-import io
-from typing import List, Dict, Any, Optional, Callable, Iterator, Set, TextIO
+from typing import List, Dict, Any, Optional, Iterator
 import logging
-from datetime import datetime
 
 # 导入项目其他模块
 from .rdap_client import RdapClient
@@ -25,6 +22,15 @@ from .notifier import Notifier
 # 配置日志
 logger = logging.getLogger("scanner")
 
+# 统计计数的列: 检查数, 可用, 已注册, 速率限制, 错误
+_STAT_COLUMNS = ('checked', 'available', 'registered', 'rate_limited', 'errors')
+
+# 不可用域名的状态到计数列的映射，其余状态计为错误
+_STATUS_INDEX = {'registered': 2, 'rate_limited': 3}
+
+# 可用域名的Markdown表格行模板: 域名, 状态说明, 检查时间
+_MD_ROW = "| %s | %s | %s |\n"
+
 
 class DomainScanner:
     """域名扫描协调器，管理整个扫描流程"""
@@ -41,6 +47,7 @@ class DomainScanner:
         self.delay = config.get("delay", 1.0)
         self.max_retries = config.get("max_retries", 2)
         self.hedgedoc_url = config.get("hedgedoc_url", "https://domain.gfw.li")
+        self.rdap_cache = config.get("rdap_cache", "")
 
         # 域名源设置
         self.domain_source = config.get("domain_source", "auto")  # 添加这一行
@@ -57,11 +64,16 @@ class DomainScanner:
         self.domains_file = "domains.txt"
         self.generator_file = "generator_func.py"
 
-        # 内存中存储结果的缓冲区
-        self.result_buffer = io.StringIO()
+        # 按秒缓存的格式化时间 (秒级时间戳, 格式化字符串)
+        self._ts_cache = (0, "")
+
+        # 内存中存储结果的缓冲区 (逐段追加，上传时一次拼接)
+        self.result_buffer: List[str] = []
 
         # 初始化组件
-        self.rdap_client = RdapClient(max_retries=self.max_retries)
+        # 配置的查询间隔作为每个RDAP服务器主机的最小间隔 (共用主机的TLD共享)，由客户端的令牌桶执行
+        self.rdap_client = RdapClient(max_retries=self.max_retries, cache_path=self.rdap_cache or None,
+                                      query_delay=self.delay)
         self.generator = DomainGenerator()
         self.uploader = ResultUploader(hedgedoc_url=self.hedgedoc_url)
         self.notifier = Notifier(method=self.notification_method, config=self.notification_config)
@@ -73,20 +85,25 @@ class DomainScanner:
             'registered': 0,
             'errors': 0,
             'rate_limited': 0,
+            'cache_hits': 0,
             'start_time': None,
             'end_time': None,
             'tld_stats': {tld: {'checked': 0, 'available': 0} for tld in self.tlds}
         }
+        self._reset_counts()
 
         # 检查TLD是否受支持
         self._validate_tlds()
 
+        # 后台预热要查询的RDAP服务器连接
+        self.rdap_client.warm_up(self.tlds)
+
         # 初始化结果缓冲区
         self._initialize_result_buffer()
 
     def _validate_tlds(self) -> None:
         """验证配置的TLD是否受支持"""
-        supported_tlds = self.rdap_client.get_supported_tlds()
+        supported_tlds = self.rdap_client.get_supported_tlds()  # 集合，成员判断为O(1)
         unsupported = [tld for tld in self.tlds if tld not in supported_tlds]
 
         if unsupported:
@@ -95,22 +112,22 @@ class DomainScanner:
 
     def _initialize_result_buffer(self) -> None:
         """初始化结果缓冲区，添加Markdown头信息"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = self._now_str()
 
         # 文档标题
-        self.result_buffer.write(f"# 域名可用性扫描结果\n\n")
+        self.result_buffer.append(f"# 域名可用性扫描结果\n\n")
 
         # 基本信息部分
-        self.result_buffer.write("## 扫描信息\n\n")
-        self.result_buffer.write(f"- **扫描时间**: {timestamp}\n")
-        self.result_buffer.write(f"- **扫描TLD**: {', '.join(self.tlds)}\n\n")
+        self.result_buffer.append("## 扫描信息\n\n")
+        self.result_buffer.append(f"- **扫描时间**: {timestamp}\n")
+        self.result_buffer.append(f"- **扫描TLD**: {', '.join(self.tlds)}\n\n")
 
         # 结果表格标题
-        self.result_buffer.write("## 可用域名列表\n\n")
+        self.result_buffer.append("## 可用域名列表\n\n")
 
         # Markdown表格头部
-        self.result_buffer.write("| 域名 | 状态说明 | 检查时间 |\n")
-        self.result_buffer.write("|------|----------|----------|\n")
+        self.result_buffer.append("| 域名 | 状态说明 | 检查时间 |\n")
+        self.result_buffer.append("|------|----------|----------|\n")
 
     def run(self) -> bool:
         """
@@ -187,30 +204,31 @@ class DomainScanner:
         last_progress_time = time.time()
         progress_interval = 5  # 进度更新间隔(秒)
 
-        # 扫描每个域名基础部分
-        for domain_base in domains_generator:
-            for tld in self.tlds:
-                full_domain = f"{domain_base}{tld}"
-
-                # 检查域名可用性
-                result = self.rdap_client.check_domain(full_domain)
+        # 展开为完整域名，按需读取，不会一次性生成全部域名
+        tlds = tuple(self.tlds)
+        full_domains = (domain_base + tld for domain_base in domains_generator for tld in tlds)
 
-                # 更新统计信息
-                self._update_stats(result)
+        # 循环内频繁使用的方法绑定为局部变量
+        update_stats = self._update_stats
+        log_result = self._log_result
+        save_result = self._save_result
+        now = time.time
 
-                # 记录结果
-                self._log_result(result)
+        # 并发检查域名可用性: 每个RDAP服务器独立排队和限速，结果按完成顺序返回
+        # 统计和结果记录都在当前线程中进行，无需加锁
+        for result in self.rdap_client.check_domains(full_domains):
+            # 更新统计信息
+            update_stats(result)
 
-                # 如果域名可用，保存到结果缓冲区
-                if result['available']:
-                    self._save_result(result)
+            # 记录结果
+            log_result(result)
 
-                # 查询间隔
-                if self.delay > 0:
-                    time.sleep(self.delay)
+            # 如果域名可用，保存到结果缓冲区
+            if result['available']:
+                save_result(result)
 
             # 定期更新进度
-            current_time = time.time()
+            current_time = now()
             if current_time - last_progress_time >= progress_interval:
                 self._log_progress()
                 last_progress_time = current_time
@@ -218,6 +236,16 @@ class DomainScanner:
         # 扫描完成，处理结果
         self._finalize_scan()
 
+    def _reset_counts(self) -> None:
+        """
+        重置按TLD分行的统计计数
+
+        扫描过程中只累加计数数组，需要输出统计时再由_collect_stats汇总到self.stats
+        """
+        self._tld_index = {tld: i for i, tld in enumerate(self.tlds)}
+        # 最后一行记录不属于扫描TLD的结果 (如格式无效的域名)
+        self._counts = [[0] * len(_STAT_COLUMNS) for _ in range(len(self.tlds) + 1)]
+
     def _update_stats(self, result: Dict[str, Any]) -> None:
         """
         更新扫描统计信息
@@ -225,26 +253,27 @@ class DomainScanner:
         参数:
             result: 域名查询结果
         """
-        # 更新总计数
+        # 更新总计数 (日志序号使用，需要实时更新)
         self.stats['total_checked'] += 1
 
-        # 更新状态计数
-        status = result['status']
-        if result['available']:
-            self.stats['available'] += 1
-        elif status == 'registered':
-            self.stats['registered'] += 1
-        elif status == 'rate_limited':
-            self.stats['rate_limited'] += 1
-        else:
-            self.stats['errors'] += 1
+        # 命中RDAP结果缓存的查询没有访问网络 (已知无RDAP服务的TLD直接返回，不计入)
+        if result.get('cache_hit'):
+            self.stats['cache_hits'] += 1
 
-        # 更新TLD统计
-        tld = result['tld']
-        if tld in self.stats['tld_stats']:
-            self.stats['tld_stats'][tld]['checked'] += 1
-            if result['available']:
-                self.stats['tld_stats'][tld]['available'] += 1
+        # 按TLD和状态累加计数
+        row = self._counts[self._tld_index.get(result['tld'], -1)]
+        row[0] += 1
+        row[1 if result['available'] else _STATUS_INDEX.get(result['status'], 4)] += 1
+
+    def _collect_stats(self) -> None:
+        """将计数数组汇总到self.stats"""
+        counts = self._counts
+        for column in range(1, len(_STAT_COLUMNS)):
+            self.stats[_STAT_COLUMNS[column]] = sum(row[column] for row in counts)
+
+        tld_stats = self.stats['tld_stats']
+        for tld, i in self._tld_index.items():
+            tld_stats[tld] = {'checked': counts[i][0], 'available': counts[i][1]}
 
     def _log_result(self, result: Dict[str, Any]) -> None:
         """
@@ -253,24 +282,30 @@ class DomainScanner:
         参数:
             result: 域名查询结果
         """
-        domain = result['domain']
-        status = result['status']
-        status_cn = result['status_cn']
+        error = result.get('error')
+
+        # 根据结果状态确定日志级别
+        if result['available']:
+            level = logging.INFO
+        elif result['status'] == 'rate_limited':
+            level = logging.WARNING
+        elif error:
+            level = logging.ERROR
+        else:
+            level = logging.DEBUG  # 使用debug级别避免日志过于冗长
+
+        # 大多数结果为debug级别，未启用时不构建日志消息
+        if not logger.isEnabledFor(level):
+            return
 
         # 创建日志消息
-        log_message = f"[{self.stats['total_checked']}] {domain} - {status_cn}"
-        if 'error' in result and result['error']:
-            log_message += f" - {result['error']}"
+        log_message = f"[{self.stats['total_checked']}] {result['domain']} - {result['status_cn']}"
+        if error:
+            log_message += f" - {error}"
 
-        # 根据结果状态记录到不同级别的日志
         if result['available']:
-            logger.info(f"发现可用域名: {log_message}")
-        elif status == 'rate_limited':
-            logger.warning(log_message)
-        elif 'error' in result and result['error']:
-            logger.error(log_message)
-        else:
-            logger.debug(log_message)  # 使用debug级别避免日志过于冗长
+            log_message = f"发现可用域名: {log_message}"
+        logger.log(level, log_message)
 
     def _save_result(self, result: Dict[str, Any]) -> None:
         """
@@ -280,16 +315,34 @@ class DomainScanner:
             result: 域名查询结果
         """
         if result['available']:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = self._now_str()
 
             # 使用Markdown表格行格式
-            self.result_buffer.write(f"| {result['domain']} | {result['status_cn']} | {timestamp} |\n")
+            self.result_buffer.append(_MD_ROW % (result['domain'], result['status_cn'], timestamp))
+
+    def _now_str(self) -> str:
+        """
+        获取当前时间的格式化字符串 (精确到秒)
+
+        同一秒内的多次调用直接返回缓存的字符串
+
+        返回:
+            "%Y-%m-%d %H:%M:%S"格式的当前时间
+        """
+        now = int(time.time())
+        cached_second, text = self._ts_cache
+        if cached_second != now:
+            text = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+            self._ts_cache = (now, text)
+        return text
 
     def _log_progress(self) -> None:
         """记录当前扫描进度到日志"""
-        if self.stats['total_checked'] == 0:
+        if self.stats['total_checked'] == 0 or not logger.isEnabledFor(logging.INFO):
             return
 
+        self._collect_stats()
+
         elapsed = time.time() - self.stats['start_time']
         rate = self.stats['total_checked'] / elapsed if elapsed > 0 else 0
 
@@ -300,6 +353,7 @@ class DomainScanner:
             f"已注册: {self.stats['registered']}",
             f"错误: {self.stats['errors']}",
             f"速率限制: {self.stats['rate_limited']}",
+            f"缓存命中: {self.stats['cache_hits']}",
             f"耗时: {elapsed:.1f} 秒",
             f"速度: {rate:.2f} 个域名/秒",
             "----------------"
@@ -319,6 +373,7 @@ class DomainScanner:
             error: 错误信息(如有)
         """
         self.stats['end_time'] = time.time()
+        self._collect_stats()
 
         # 计算统计信息
         duration = self.stats['end_time'] - self.stats['start_time']
@@ -349,23 +404,23 @@ class DomainScanner:
         """将扫描统计信息以Markdown格式写入结果缓冲区"""
         try:
             # 计算统计数据
-            end_time = datetime.fromtimestamp(self.stats['end_time']).strftime("%Y-%m-%d %H:%M:%S")
+            end_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.stats['end_time']))
             duration = self.stats['end_time'] - self.stats['start_time']
 
             # 添加统计部分标题
-            self.result_buffer.write("\n## 扫描统计\n\n")
+            self.result_buffer.append("\n## 扫描统计\n\n")
 
             # 基本统计信息
-            self.result_buffer.write("### 基本统计\n\n")
-            self.result_buffer.write(f"- **扫描结束时间**: {end_time}\n")
-            self.result_buffer.write(f"- **总检查域名数**: {self.stats['total_checked']}\n")
-            self.result_buffer.write(f"- **发现可用域名**: {self.stats['available']}\n")
-            self.result_buffer.write(f"- **总耗时**: {duration:.1f} 秒\n")
+            self.result_buffer.append("### 基本统计\n\n")
+            self.result_buffer.append(f"- **扫描结束时间**: {end_time}\n")
+            self.result_buffer.append(f"- **总检查域名数**: {self.stats['total_checked']}\n")
+            self.result_buffer.append(f"- **发现可用域名**: {self.stats['available']}\n")
+            self.result_buffer.append(f"- **总耗时**: {duration:.1f} 秒\n")
 
             # TLD统计信息表格
-            self.result_buffer.write("\n### TLD统计\n\n")
-            self.result_buffer.write("| TLD | 检查数量 | 可用数量 | 可用率 |\n")
-            self.result_buffer.write("|-----|----------|----------|-------|\n")
+            self.result_buffer.append("\n### TLD统计\n\n")
+            self.result_buffer.append("| TLD | 检查数量 | 可用数量 | 可用率 |\n")
+            self.result_buffer.append("|-----|----------|----------|-------|\n")
 
             for tld in self.tlds:
                 stats = self.stats['tld_stats'][tld]
@@ -374,13 +429,13 @@ class DomainScanner:
 
                 if checked_count > 0:
                     available_percent = (available_count / checked_count) * 100
-                    self.result_buffer.write(f"| {tld} | {checked_count} | {available_count} | {available_percent:.1f}% |\n")
+                    self.result_buffer.append(f"| {tld} | {checked_count} | {available_count} | {available_percent:.1f}% |\n")
                 else:
-                    self.result_buffer.write(f"| {tld} | 0 | 0 | 0.0% |\n")
+                    self.result_buffer.append(f"| {tld} | 0 | 0 | 0.0% |\n")
 
             # 添加简短的结束说明
-            self.result_buffer.write("\n---\n")
-            self.result_buffer.write(f"*报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*\n")
+            self.result_buffer.append("\n---\n")
+            self.result_buffer.append(f"*报告生成时间: {self._now_str()}*\n")
 
         except Exception as e:
             logger.error(f"写入统计信息到缓冲区时出错: {e}", exc_info=True)
@@ -394,14 +449,14 @@ class DomainScanner:
         """
         try:
             # 获取缓冲区内容
-            markdown_content = self.result_buffer.getvalue()
+            markdown_content = "".join(self.result_buffer)
 
             # 如果没有可用域名，添加提示信息
             if self.stats['available'] == 0:
                 markdown_content += "\n\n> 注意：本次扫描未发现可用域名。\n"
 
             # 生成标题，包含时间和TLD信息
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+            timestamp = time.strftime("%Y%m%d%H%M%S")
             title = f"域名扫描结果 - {timestamp} - {','.join(self.tlds)}"
 
             # 上传内容
@@ -426,7 +481,7 @@ class DomainScanner:
             url: 结果URL
         """
         try:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = self._now_str()
             tlds_str = ', '.join(self.tlds)
             url_entry = f"[{timestamp}] TLDs: {tlds_str} - {url}\n"
 
@@ -481,13 +536,15 @@ class DomainScanner:
             'registered': 0,
             'errors': 0,
             'rate_limited': 0,
+            'cache_hits': 0,
             'start_time': None,
             'end_time': None,
             'tld_stats': {tld: {'checked': 0, 'available': 0} for tld in self.tlds}
         }
+        self._reset_counts()
 
         # 重置结果缓冲区
-        self.result_buffer = io.StringIO()
+        self.result_buffer.clear()
         self._initialize_result_buffer()
 
     def close(self) -> None:
@@ -499,9 +556,20 @@ class DomainScanner:
             except Exception:
                 pass
 
-        # 关闭结果缓冲区
-        if hasattr(self, 'result_buffer') and self.result_buffer:
+        # 关闭结果上传器
+        if hasattr(self, 'uploader') and self.uploader:
             try:
-                self.result_buffer.close()
+                self.uploader.close()
             except Exception:
                 pass
+
+        # 关闭通知发送器
+        if hasattr(self, 'notifier') and self.notifier:
+            try:
+                self.notifier.close()
+            except Exception:
+                pass
+
+        # 释放结果缓冲区
+        if hasattr(self, 'result_buffer'):
+            self.result_buffer.clear()
@@ -11,12 +11,27 @@ uploader.py
 import requests
 import os
 import logging
-from urllib.parse import urlparse
-from typing import Optional, Tuple, Dict, Any
+import gzip
+import itertools
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Tuple, Dict, Any, Iterable, Union, BinaryIO
 
 # 配置日志
 logger = logging.getLogger("uploader")
 
+# HedgeDoc请求超时 (连接, 读取) 秒
+UPLOAD_TIMEOUT = (5, 30)
+
+# 超过该大小(字节)的内容以gzip压缩后上传
+GZIP_UPLOAD_THRESHOLD = 16 * 1024
+
+# 超过该大小(字节)的文件直接从磁盘流式上传，不整体读入内存
+STREAM_UPLOAD_THRESHOLD = 256 * 1024
+
+# 流式上传时每次读取的块大小(字节)
+STREAM_CHUNK_SIZE = 64 * 1024
+
 class ResultUploader:
     """结果文件上传器，支持将Markdown文件上传到HedgeDoc服务"""
 
@@ -28,6 +43,15 @@ class ResultUploader:
             hedgedoc_url: HedgeDoc服务的基础URL
         """
         self.hedgedoc_url = hedgedoc_url.rstrip('/')
+
+        # 创建笔记和获取发布URL复用同一个会话，第二次请求沿用已建立的连接
+        self._session: Optional[requests.Session] = requests.Session()
+        # 连接失败时重试；服务器5xx只对GET重试 (默认的allowed_methods不含POST，避免重复创建笔记)
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
         logger.info(f"初始化结果上传器，目标服务: {self.hedgedoc_url}")
 
     def upload_markdown_content(self, markdown_content: str, title: str = "域名扫描结果") -> Tuple[bool, str, Optional[str]]:
@@ -48,27 +72,53 @@ class ResultUploader:
             if not markdown_content.startswith("# "):
                 markdown_content = f"# {title}\n\n{markdown_content}"
 
+            data = markdown_content.encode('utf-8')
+        except Exception as e:
+            error_msg = f"上传过程中发生未知错误: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return False, error_msg, None
+
+        return self._create_and_publish(data)
+
+    def _create_and_publish(self, data: Union[bytes, BinaryIO, Iterable[bytes]]) -> Tuple[bool, str, Optional[str]]:
+        """
+        创建笔记并获取发布URL
+
+        参数:
+            data: UTF-8编码的Markdown内容，可以是字节串、二进制文件对象或字节块迭代器
+
+        返回:
+            (成功状态, 消息, 分享URL)元组
+        """
+        try:
             # 步骤1: 创建笔记
             create_url = f"{self.hedgedoc_url}/new"
             headers = {'Content-Type': 'text/markdown; charset=utf-8'}
 
+            # 较大的内容压缩后上传 (结果表格重复内容多，压缩率很高)
+            body = data
+            if isinstance(data, bytes) and len(data) > GZIP_UPLOAD_THRESHOLD:
+                body = gzip.compress(data, compresslevel=6)
+                headers['Content-Encoding'] = 'gzip'
+
             logger.debug(f"发送POST请求到: {create_url}")
             # 发送POST请求创建笔记
-            response = requests.post(
-                create_url,
-                data=markdown_content.encode('utf-8'),
-                headers=headers,
-                allow_redirects=False  # 不自动跟随重定向
-            )
+            session = self._session or requests
+            response = self._post_note(session, create_url, body, headers)
+
+            # 服务器不接受压缩的请求体时，改为发送原始内容
+            if response.status_code == 415 and 'Content-Encoding' in headers:
+                logger.debug("服务器不接受gzip压缩的请求体，改为发送未压缩内容")
+                del headers['Content-Encoding']
+                response = self._post_note(session, create_url, data, headers)
 
             # 检查是否重定向(通常是302)并获取Location头部
             if response.status_code in (301, 302, 303, 307, 308) and 'Location' in response.headers:
                 editable_url = response.headers['Location']
                 logger.debug(f"获取到编辑URL: {editable_url}")
 
-                # 从URL中提取Note ID
-                parsed_url = urlparse(editable_url)
-                note_id = os.path.basename(parsed_url.path)  # 获取路径的最后一部分
+                # 从URL中提取Note ID (路径的最后一部分，去掉查询参数和锚点)
+                note_id = editable_url.rsplit('/', 1)[-1].split('?', 1)[0].split('#', 1)[0]
 
                 if not note_id:
                     raise ValueError("无法从编辑URL中提取Note ID")
@@ -80,9 +130,10 @@ class ResultUploader:
                 logger.debug(f"请求发布URL: {publish_endpoint_url}")
 
                 # 发送GET请求获取发布URL
-                response = requests.get(
+                response = session.get(
                     publish_endpoint_url,
-                    allow_redirects=False  # 不自动跟随重定向
+                    allow_redirects=False,  # 不自动跟随重定向
+                    timeout=UPLOAD_TIMEOUT
                 )
 
                 if response.status_code in (301, 302, 303, 307, 308) and 'Location' in response.headers:
@@ -113,6 +164,17 @@ class ResultUploader:
             logger.error(error_msg, exc_info=True)
             return False, error_msg, None
 
+    @staticmethod
+    def _post_note(session: Any, create_url: str, body: Any, headers: Dict[str, str]) -> requests.Response:
+        """发送创建笔记的POST请求"""
+        return session.post(
+            create_url,
+            data=body,
+            headers=headers,
+            allow_redirects=False,  # 不自动跟随重定向
+            timeout=UPLOAD_TIMEOUT
+        )
+
     def upload_markdown_file(self, file_path: str) -> Tuple[bool, str, Optional[str]]:
         """
         上传Markdown文件到HedgeDoc
@@ -131,6 +193,10 @@ class ResultUploader:
             logger.error(error_msg)
             return False, error_msg, None
 
+        # 大文件流式上传，避免整体读入内存再编码
+        if os.path.getsize(file_path) > STREAM_UPLOAD_THRESHOLD:
+            return self._upload_markdown_stream(file_path)
+
         try:
             # 读取文件内容
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -147,3 +213,40 @@ class ResultUploader:
             error_msg = f"读取文件时发生错误: {str(e)}"
             logger.error(error_msg, exc_info=True)
             return False, error_msg, None
+
+    def _upload_markdown_stream(self, file_path: str, title: str = "域名扫描结果") -> Tuple[bool, str, Optional[str]]:
+        """
+        以二进制方式从磁盘流式上传Markdown文件
+
+        文件已有标题时直接上传文件对象，否则在文件内容前拼接标题后分块上传
+
+        参数:
+            file_path: Markdown文件路径(UTF-8编码)
+            title: 文件内容没有标题时添加的文档标题
+
+        返回:
+            (成功状态, 消息, 分享URL)元组
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                has_title = f.read(2) == b"# "
+                f.seek(0)
+
+                if has_title:
+                    data = f
+                else:
+                    chunks = iter(lambda: f.read(STREAM_CHUNK_SIZE), b'')
+                    data = itertools.chain([f"# {title}\n\n".encode('utf-8')], chunks)
+
+                return self._create_and_publish(data)
+
+        except OSError as e:
+            error_msg = f"读取文件时发生错误: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return False, error_msg, None
+
+    def close(self) -> None:
+        """关闭连接会话"""
+        if self._session:
+            self._session.close()
+            self._session = None
@@ -23,42 +23,35 @@ def generate_domains():
     letters_sample = letters[:5]  # "abcde"
     digits_sample = digits[:5]    # "01234"
 
-    # 生成字母+数字组合
-    for l1 in letters_sample:
-        for l2 in letters_sample:
-            for d1 in digits_sample:
-                for d2 in digits_sample:
-                    yield f"{l1}{l2}{d1}{d2}"
+    # 生成字母+数字组合 (笛卡尔积由itertools.product在C层完成)
+    for combo in itertools.product(letters_sample, letters_sample, digits_sample, digits_sample):
+        yield ''.join(combo)
 
     # 示例2: 短词+短词组合
     prefixes = ["web", "app", "net", "dev", "top", "get", "try", "buy", "use"]
     suffixes = ["pro", "hub", "lab", "app", "box", "now", "run", "kit", "go"]
 
-    for prefix in prefixes:
-        for suffix in suffixes:
-            yield f"{prefix}{suffix}"
+    for prefix, suffix in itertools.product(prefixes, suffixes):
+        yield prefix + suffix
 
     # 示例3: 特殊替换模式 (leet speak)
     # 例如: a -> 4, e -> 3, i -> 1, o -> 0
     words = ["secure", "private", "crypto", "elite", "master", "hacker", "code"]
     leet_map = {'a': '4', 'e': '3', 'i': '1', 'o': '0', 's': '5', 't': '7'}
+    leet_trans = str.maketrans(leet_map)  # 预先生成转换表，整个单词一次转换
 
     for word in words:
         # 原始单词
         yield word
 
         # 基本leet转换(转换所有可能的字符)
-        leet_word = ''
-        for char in word:
-            leet_word += leet_map.get(char, char)
-        yield leet_word
+        yield word.translate(leet_trans)
 
         # 随机leet转换(随机转换部分字符)
         for i in range(3):  # 为每个单词生成3个随机变体
-            rand_leet = ''
-            for char in word:
-                if char in leet_map and random.random() > 0.5:
-                    rand_leet += leet_map[char]
-                else:
-                    rand_leet += char
-            yield rand_leet
+            # 每个字符对应随机数的一位，该位为1且字符可转换时才转换
+            bits = random.getrandbits(len(word))
+            yield ''.join(
+                leet_map[char] if bits >> pos & 1 and char in leet_map else char
+                for pos, char in enumerate(word)
+            )
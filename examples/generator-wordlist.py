@@ -9,6 +9,7 @@
 
 import os
 import random
+import itertools
 
 def generate_domains():
     """基于词典的域名生成器函数"""
@@ -22,7 +23,7 @@ def generate_domains():
         "page", "face", "news", "school", "story", "power", "line", "end", "member",
         "law", "car", "city", "name", "team", "game", "food", "sun", "air", "net",
         "shop", "art", "war", "land", "call", "level", "hour", "type", "film", "data",
-        "form", "event", "plan", "room", "room", "lot", "mind", "need", "job", "road"
+        "form", "event", "plan", "room", "lot", "mind", "need", "job", "road"
     ]
 
     # 示例1: 单词组合
@@ -32,14 +33,14 @@ def generate_domains():
 
         # 限制组合数量，避免生成过多
         if i < 20:  # 仅为前20个单词生成组合
-            # 两个单词组合
-            for j, word2 in enumerate(common_words):
-                if i != j:  # 避免重复单词
-                    yield f"{word1}{word2}"
+            # 两个单词组合 (跳过单词自身，避免重复单词)
+            for j in itertools.chain(range(i), range(i + 1, len(common_words))):
+                word2 = common_words[j]
+                yield f"{word1}{word2}"
 
-                    # 带连字符的组合
-                    if j < 5:  # 进一步限制，仅生成少量组合
-                        yield f"{word1}-{word2}"
+                # 带连字符的组合
+                if j < 5:  # 进一步限制，仅生成少量组合
+                    yield f"{word1}-{word2}"
 
     # 示例2: 单词+数字组合
     for word in common_words[:10]:  # 仅使用前10个单词
@@ -50,19 +51,26 @@ def generate_domains():
     # 示例3: 从外部文件加载词典(如果存在)
     # 这部分通常需要调整为您自己的词典文件路径
     wordlist_path = os.path.join("wordlists", "english.txt")
-    if os.path.exists(wordlist_path):
-        try:
-            with open(wordlist_path, 'r', encoding='utf-8') as f:
-                external_words = [line.strip() for line in f]
+    try:
+        with open(wordlist_path, 'r', encoding='utf-8') as f:
+            # 随机选择一部分单词，避免使用整个词典
+            # (蓄水池抽样，边读边抽，不需要把整个词典读入内存)
+            sample_size = 100
+            sampled_words = []
+            for n, line in enumerate(f):
+                if n < sample_size:
+                    sampled_words.append(line.strip())
+                else:
+                    k = random.randrange(n + 1)
+                    if k < sample_size:
+                        sampled_words[k] = line.strip()
 
-                # 随机选择一部分单词，避免使用整个词典
-                sample_size = min(100, len(external_words))
-                sampled_words = random.sample(external_words, sample_size)
-
-                # 生成单词
-                for word in sampled_words:
-                    if 3 <= len(word) <= 10:  # 仅使用适当长度的单词
-                        yield word
-        except Exception as e:
-            print(f"读取外部词典出错: {e}")
-            # 出错时忽略，继续使用内置词典
+            # 生成单词
+            for word in sampled_words:
+                if 3 <= len(word) <= 10:  # 仅使用适当长度的单词
+                    yield word
+    except FileNotFoundError:
+        pass  # 词典文件不存在时只使用内置词典
+    except Exception as e:
+        print(f"读取外部词典出错: {e}")
+        # 出错时忽略，继续使用内置词典
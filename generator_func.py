@@ -8,6 +8,19 @@ DomainSeeker 默认域名生成器函数。
 此文件必须包含一个名为generate_domains的函数，用于生成域名基础部分。
 """
 
+# 简单域名列表示例
+_DOMAINS = (
+    "example",
+    "test",
+    "mywebsite",
+    "cool-domain"
+)
+
+# 简单组合示例 (前缀+单词)，组合在导入时生成一次
+_PREFIXES = ("my", "best", "top")
+_WORDS = ("app", "site", "blog")
+_COMBINATIONS = tuple(prefix + word for prefix in _PREFIXES for word in _WORDS)
+
 def generate_domains():
     """
     生成要检查的域名基础部分。
@@ -19,22 +32,8 @@ def generate_domains():
 
     参考示例目录中的示例了解更多生成方式。
     """
-    # 简单域名列表示例
-    domains = [
-        "example",
-        "test",
-        "mywebsite",
-        "cool-domain"
-    ]
-
     # 返回域名
-    for domain in domains:
-        yield domain
-
-    # 简单组合示例 (前缀+单词)
-    prefixes = ["my", "best", "top"]
-    words = ["app", "site", "blog"]
+    yield from _DOMAINS
 
-    for prefix in prefixes:
-        for word in words:
-            yield f"{prefix}{word}"
+    # 返回组合域名
+    yield from _COMBINATIONS
@@ -13,7 +13,10 @@ import sys
 import os
 
 # 添加当前目录到Python路径，确保能够导入项目模块
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# (以 python main.py 运行时脚本所在目录已是sys.path[0]，无需重复插入)
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+if _PROJECT_DIR not in sys.path:
+    sys.path.insert(0, _PROJECT_DIR)
 
 # 导入命令行接口模块
 from core.cli import main
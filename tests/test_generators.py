@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_generators.py
+
+DomainGenerator.from_file 的换行符处理测试
+"""
+
+import os
+import tempfile
+import unittest
+
+from core.generators import DomainGenerator
+
+
+class FromFileLineEndingTest(unittest.TestCase):
+    """from_file应与文本模式的通用换行一致，识别\\n、\\r\\n和单独的\\r"""
+
+    def _load(self, content: bytes):
+        fd, path = tempfile.mkstemp(suffix=".txt")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            return list(DomainGenerator().from_file(path))
+        finally:
+            os.remove(path)
+
+    def test_lf(self):
+        self.assertEqual(self._load(b"a\nb\nc\n"), ['a', 'b', 'c'])
+
+    def test_crlf(self):
+        self.assertEqual(self._load(b"a\r\nb\r\nc\r\n"), ['a', 'b', 'c'])
+
+    def test_cr_only(self):
+        self.assertEqual(self._load(b"a\rb\rc\r"), ['a', 'b', 'c'])
+
+    def test_mixed(self):
+        self.assertEqual(self._load(b"a\rb\r\n# comment\rc\nBad_Name\rd"), ['a', 'b', 'c', 'd'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+test_rdap_client.py
+
+RdapClient的限速、重定向、结果缓存和批量调度测试 (使用假会话，不访问网络)
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from core import rdap_client
+from core.rdap_client import RdapClient, TokenBucket, QueryCancelled, ResultCache
+
+
+def setUpModule():
+    # 重试和缓存回退的警告日志在测试中是预期的，不输出
+    logging.disable(logging.WARNING)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class FakeResponse:
+    """只包含状态码和响应头的假响应"""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeSession:
+    """按 (方法, URL) 调用responder返回预设响应的假会话，并记录所有请求"""
+
+    def __init__(self, responder):
+        self.responder = responder
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.calls.append((method, url))
+        return self.responder(method, url)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def close(self):
+        pass
+
+
+def make_client(responder, **kwargs):
+    """创建使用假会话的客户端，不加载引导数据也不写缓存文件"""
+    kwargs.setdefault('prefer_direct', False)
+    client = RdapClient(bootstrap_cache=None, **kwargs)
+    client.session = FakeSession(responder)
+    return client
+
+
+def fast_bucket():
+    """令牌充足的令牌桶，测试中不因限速等待"""
+    return TokenBucket(rate=1000.0, capacity=1000)
+
+
+class TokenBucketBackoffTest(unittest.TestCase):
+    """连续限流时指数退避，收到正常响应后重置"""
+
+    def test_penalize_grows_delay(self):
+        bucket = TokenBucket(rate=1.0)
+        with mock.patch.object(rdap_client.random, 'random', return_value=1.0):
+            delays = [bucket.penalize() for _ in range(4)]
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 8.0])
+        self.assertEqual(bucket.consecutive_limited, 4)
+
+    def test_penalize_is_capped(self):
+        bucket = TokenBucket(rate=1.0)
+        with mock.patch.object(rdap_client.random, 'random', return_value=1.0):
+            for _ in range(20):
+                delay = bucket.penalize()
+        self.assertEqual(delay, rdap_client.RETRY_MAX_DELAY)
+
+    def test_penalize_uses_server_delay(self):
+        bucket = TokenBucket(rate=1.0)
+        self.assertEqual(bucket.penalize(7.5), 7.5)
+        self.assertGreater(bucket.blocked_until, time.monotonic() + 7)
+
+    def test_observe_resets_backoff(self):
+        bucket = TokenBucket(rate=1.0)
+        for _ in range(3):
+            bucket.penalize()
+        bucket.observe({})
+        self.assertEqual(bucket.consecutive_limited, 0)
+        with mock.patch.object(rdap_client.random, 'random', return_value=1.0):
+            self.assertEqual(bucket.penalize(), rdap_client.RETRY_BASE_DELAY)
+
+    def test_observe_pauses_when_quota_exhausted(self):
+        bucket = TokenBucket(rate=1.0)
+        bucket.observe({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '10'})
+        self.assertEqual(bucket.tokens, 0.0)
+        self.assertGreater(bucket.blocked_until, time.monotonic() + 9)
+
+    def test_observe_ignores_remaining_quota(self):
+        bucket = TokenBucket(rate=1.0)
+        bucket.observe({'X-RateLimit-Remaining': '3', 'X-RateLimit-Reset': '10'})
+        self.assertEqual(bucket.blocked_until, 0.0)
+
+
+class HeadFallbackTest(unittest.TestCase):
+    """服务器不支持HEAD时改用GET，两次请求各取一个令牌"""
+
+    def test_get_fallback_takes_a_token(self):
+        client = make_client(lambda method, url: FakeResponse(405 if method == 'HEAD' else 404))
+        # 几乎不补充令牌，便于统计消耗
+        bucket = client.buckets['rdap.org'] = TokenBucket(rate=1e-6, capacity=5)
+
+        client.check_domain('a.xyz')
+
+        self.assertEqual([method for method, _ in client.session.calls], ['HEAD', 'GET'])
+        self.assertAlmostEqual(bucket.tokens, 3.0, places=3)
+
+
+def make_result(domain, status):
+    return {'domain': domain, 'status': status, 'available': status == 'available'}
+
+
+class ResultCacheTest(unittest.TestCase):
+    """结果缓存按状态设置有效期，内存LRU淘汰，可持久化到SQLite"""
+
+    def setUp(self):
+        self.now = 1_000_000.0
+        patcher = mock.patch.object(rdap_client.time, 'time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_returns_copy(self):
+        cache = ResultCache()
+        cache.put('a.com|x', make_result('a.com', 'registered'))
+        hit = cache.get('a.com|x')
+        hit['status'] = 'changed'
+        self.assertEqual(cache.get('a.com|x')['status'], 'registered')
+
+    def test_nondeterministic_results_not_cached(self):
+        cache = ResultCache()
+        for status in ('timeout', 'rate_limited', 'error'):
+            cache.put(f'{status}.com|x', make_result(f'{status}.com', status))
+            self.assertIsNone(cache.get(f'{status}.com|x'))
+
+    def test_ttl_depends_on_status(self):
+        cache = ResultCache()
+        cache.put('free.com|x', make_result('free.com', 'available'))
+        cache.put('taken.com|x', make_result('taken.com', 'registered'))
+
+        self.now += rdap_client.CACHE_TTL['available'] + 1
+        self.assertIsNone(cache.get('free.com|x'))
+        self.assertIsNotNone(cache.get('taken.com|x'))
+
+        self.now += rdap_client.CACHE_TTL['registered']
+        self.assertIsNone(cache.get('taken.com|x'))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(maxsize=2)
+        cache.put('a.com|x', make_result('a.com', 'registered'))
+        cache.put('b.com|x', make_result('b.com', 'registered'))
+        cache.get('a.com|x')  # a变为最近使用
+        cache.put('c.com|x', make_result('c.com', 'registered'))
+
+        self.assertIsNotNone(cache.get('a.com|x'))
+        self.assertIsNone(cache.get('b.com|x'))
+        self.assertIsNotNone(cache.get('c.com|x'))
+
+    def test_sqlite_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sub', 'cache.db')
+            cache = ResultCache(path)
+            cache.put('free.com|x', make_result('free.com', 'available'))
+            cache.put('taken.com|x', make_result('taken.com', 'registered'))
+            cache.close()
+
+            reopened = ResultCache(path)
+            self.assertEqual(reopened.get('taken.com|x'), make_result('taken.com', 'registered'))
+            reopened.close()
+
+            # 重新打开时清理已过期的条目
+            self.now += rdap_client.CACHE_TTL['available'] + 1
+            reopened = ResultCache(path)
+            rows = reopened._db.execute("SELECT key FROM rdap_cache").fetchall()
+            reopened.close()
+            self.assertEqual(rows, [('taken.com|x',)])
+
+    def test_unusable_path_falls_back_to_memory(self):
+        with tempfile.NamedTemporaryFile() as f:
+            # 父路径是普通文件，无法创建缓存目录
+            cache = ResultCache(os.path.join(f.name, 'cache.db'))
+            self.assertIsNone(cache._db)
+            cache.put('a.com|x', make_result('a.com', 'registered'))
+            self.assertIsNotNone(cache.get('a.com|x'))
+
+
+class CacheHitFlagTest(unittest.TestCase):
+    """只有命中结果缓存的结果带cache_hit标记"""
+
+    def test_cache_hit_and_known_bad_tld(self):
+        # RDAP.org对.zzz返回404 (TLD无RDAP服务)，对其他域名返回200 (已注册)
+        client = make_client(lambda method, url: FakeResponse(404 if url.endswith('.zzz') else 200))
+        client.buckets['rdap.org'] = fast_bucket()
+
+        first = client.check_domain('a.xyz')
+        hit = client.check_domain('a.xyz')
+        client.check_domain('a.zzz')
+        shortcut = client.check_domain('b.zzz')
+
+        self.assertNotIn('cached', first)
+        self.assertTrue(hit['cached'])
+        self.assertTrue(hit['cache_hit'])
+        # 已知无RDAP服务的TLD直接返回，不算缓存命中
+        self.assertTrue(shortcut['cached'])
+        self.assertNotIn('cache_hit', shortcut)
+        self.assertEqual(len(client.session.calls), 2)
+
+class RedirectRateLimitTest(unittest.TestCase):
+    """RDAP.org重定向时，RDAP.org和重定向目标分别记录限流信息"""
+
+    def test_redirect_applies_rdap_org_rate_limit_headers(self):
+        def responder(method, url):
+            if url.startswith('https://rdap.org/'):
+                return FakeResponse(302, {
+                    'Location': 'https://rdap.example/domain/a.xyz',
+                    'X-RateLimit-Remaining': '0',
+                    'X-RateLimit-Reset': '30',
+                })
+            return FakeResponse(404)
+
+        client = make_client(responder)
+        client.buckets['rdap.org'] = fast_bucket()
+        client.buckets['rdap.example'] = fast_bucket()
+
+        result = client.check_domain('a.xyz')
+
+        self.assertEqual(result['status'], 'available')
+        self.assertEqual(result['rdap_server'], 'redirect_target')
+        # RDAP.org的配额已用尽，应暂停到配额恢复；重定向目标不受影响
+        self.assertGreater(client.buckets['rdap.org'].blocked_until, time.monotonic() + 20)
+        self.assertLess(client.buckets['rdap.example'].blocked_until, time.monotonic())
+
+    def test_redirected_query_resets_rdap_org_backoff(self):
+        # 每三次查询中第一次先被RDAP.org限流，重试后重定向成功
+        attempts = []
+
+        def responder(method, url):
+            if url.startswith('https://rdap.org/'):
+                attempts.append(url)
+                if len(attempts) % 3 == 1:
+                    return FakeResponse(429)
+                return FakeResponse(302, {'Location': 'https://rdap.example/domain/x'})
+            return FakeResponse(404)
+
+        client = make_client(responder)
+        rdap_org = client.buckets['rdap.org'] = fast_bucket()
+        client.buckets['rdap.example'] = fast_bucket()
+
+        with mock.patch.object(rdap_client, 'RETRY_BASE_DELAY', 0.001):
+            for i in range(12):
+                result = client.check_domain(f"d{i}.xyz")
+                self.assertEqual(result['status'], 'available')
+                # 每次查询成功后RDAP.org的连续限流计数都应归零
+                self.assertEqual(rdap_org.consecutive_limited, 0)
+
+
+class WarmUpTest(unittest.TestCase):
+    """预热请求按服务器主机的令牌桶限速"""
+
+    def test_warm_up_takes_a_token_per_host(self):
+        client = make_client(lambda method, url: FakeResponse(200), prefer_direct=True)
+        buckets = {host: client.buckets.setdefault(host, TokenBucket(rate=1e-6, capacity=5))
+                   for host in ('rdap.verisign.com', 'rdap.denic.de')}
+
+        client.warm_up(['.com', '.net', '.de'])
+        deadline = time.monotonic() + 1.0
+        while len(client.session.calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # .com和.net共用同一主机，只预热一次
+        self.assertCountEqual(client.session.calls, [
+            ('HEAD', 'https://rdap.verisign.com/'),
+            ('HEAD', 'https://rdap.denic.de/'),
+        ])
+        for bucket in buckets.values():
+            self.assertAlmostEqual(bucket.tokens, 4.0, places=3)
+
+class CheckDomainsSchedulerTest(unittest.TestCase):
+    """check_domains按服务器主机分别排队，限制每个主机的并发数"""
+
+    def setUp(self):
+        self.active = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+        self.slow_hosts = set()
+
+    def responder(self, method, url):
+        host = url.split('/')[2]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        time.sleep(0.3 if host in self.slow_hosts else 0.02)
+        with self.lock:
+            self.active[host] -= 1
+        return FakeResponse(404)
+
+    def make_client(self):
+        client = make_client(self.responder, prefer_direct=True)
+        for host in ('rdap.verisign.com', 'rdap.denic.de'):
+            client.buckets[host] = fast_bucket()
+        return client
+
+    def test_per_host_concurrency_limit(self):
+        client = self.make_client()
+        domains = [f"d{i}{tld}" for i in range(10) for tld in ('.com', '.de')]
+
+        results = list(client.check_domains(domains, workers_per_host=2, max_pending=8))
+
+        self.assertCountEqual([r['domain'] for r in results], domains)
+        self.assertTrue(all(r['status'] == 'available' for r in results))
+        self.assertEqual(self.peak, {'rdap.verisign.com': 2, 'rdap.denic.de': 2})
+
+    def test_results_in_completion_order(self):
+        # .com的服务器很慢，排在后面的.de查询不应被它阻塞
+        self.slow_hosts.add('rdap.verisign.com')
+        client = self.make_client()
+        domains = [f"slow{i}.com" for i in range(4)] + [f"fast{i}.de" for i in range(4)]
+
+        order = [r['domain'] for r in client.check_domains(domains, workers_per_host=2)]
+
+        self.assertCountEqual(order, domains)
+        self.assertEqual(sorted(order[:4]), [f"fast{i}.de" for i in range(4)])
+
+
+class StopTest(unittest.TestCase):
+    """关闭客户端时唤醒等待令牌或重试的查询"""
+
+    def test_close_wakes_waiting_query(self):
+        client = make_client(lambda method, url: FakeResponse(404))
+        # 令牌耗尽且几乎不补充，查询会一直等待
+        bucket = client.buckets['rdap.org'] = TokenBucket(rate=1e-6, capacity=1, stop=client._stop)
+        bucket.tokens = 0.0
+        errors = []
+
+        def query():
+            try:
+                client.check_domain('a.xyz')
+            except QueryCancelled as e:
+                errors.append(e)
+
+        worker = threading.Thread(target=query)
+        worker.start()
+        time.sleep(0.05)
+        client.close()
+        worker.join(1.0)
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(client.session.calls, [])
+
+    def test_close_interrupts_retry_backoff(self):
+        client = make_client(lambda method, url: FakeResponse(404), max_retries=1)
+        client.buckets['rdap.org'] = fast_bucket()
+        client.session.responder = self.raise_timeout
+        errors = []
+
+        def query():
+            try:
+                client.check_domain('a.xyz')
+            except QueryCancelled as e:
+                errors.append(e)
+
+        with mock.patch.object(rdap_client, 'RETRY_BASE_DELAY', 60.0):
+            worker = threading.Thread(target=query)
+            worker.start()
+            time.sleep(0.05)
+            client.close()
+            worker.join(1.0)
+
+        self.assertFalse(worker.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    @staticmethod
+    def raise_timeout(method, url):
+        raise rdap_client.requests.exceptions.Timeout()
+
+
+if __name__ == "__main__":
+    unittest.main()